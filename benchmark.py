@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+benchmark.py
+Offline throughput benchmark for the scan pipeline — no network needed.
+
+A local HTTP stand-in serves synthesized Greenhouse, Lever, Ashby,
+SmartRecruiters, Workday and Adzuna payloads at the requested sizes, with
+the real pagination shapes (SmartRecruiters pages of 100, Workday pages of
+20, Greenhouse list + per-job hydration). Each (provider, size) pair runs
+the real provider code, filter_batch, diff_jobs and save_state against a
+throwaway state database in a fresh worker process, so peak RSS is
+measured per pair. Uber is left out: it needs a browser.
+
+Usage:
+    python benchmark.py                                   # 1k, 10k, 100k postings per provider
+    python benchmark.py --sizes 1000,1000000 --providers greenhouse,workday
+    python benchmark.py --output bench.json               # also save results as JSON
+    python benchmark.py --trace-memory                    # tracemalloc peak (slower)
+
+Timings (seconds):
+    fetch        provider fetch_async: HTTP + JSON parse + normalize
+    parse        the JSON parse + normalize share of fetch, from metrics.py
+    filter       filter_batch over every fetched job
+    diff/save    diff_jobs + save_state on an empty state store
+    diff2/save2  the same batch again, now all unchanged
+"""
+
+import argparse
+import http.server
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from datetime import date, timedelta
+from typing import Optional
+
+PROVIDERS = ["greenhouse", "lever", "ashby", "smartrecruiters", "workday", "adzuna"]
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+SEED = 20260215
+
+# ── Synthetic postings ───────────────────────────────────────────────────────
+
+# (title, weight) — a few percent of postings are relevant new grad SWE roles
+TITLES = [
+    ("Software Engineer, New Grad", 2),
+    ("Software Engineer I", 1),
+    ("Backend Engineer", 1),
+    ("Senior Software Engineer", 25),
+    ("Staff Software Engineer", 8),
+    ("Software Engineer III", 6),
+    ("Machine Learning Engineer", 6),
+    ("Data Engineer", 5),
+    ("Product Manager", 12),
+    ("Account Executive", 12),
+    ("Engineering Manager", 6),
+    ("Recruiter", 6),
+    ("Software Engineering Intern", 4),
+    ("Solutions Engineer", 6),
+]
+TEAMS = [
+    "Payments", "Infrastructure", "Growth", "Search", "Ads", "Identity", "Mobile",
+    "Platform", "Billing", "Risk", "Maps", "Storage", "Compute", "Developer Tools",
+]
+LOCATIONS = [
+    ("San Francisco, CA", 20), ("New York, NY", 15), ("Seattle, WA", 10),
+    ("Remote - US", 10), ("Austin, TX", 5), ("London, UK", 10),
+    ("Toronto, Canada", 8), ("Bangalore, India", 8), ("Dublin, Ireland", 5), ("N/A", 9),
+]
+DESCRIPTION = (
+    "<p>Join the {team} team at Bench Co (req {id}).</p>"
+    "<ul><li>{years} years of software experience</li>"
+    "<li>Build and operate services used by millions of people.</li></ul>"
+    "<p>{filler}</p>"
+)
+FILLER = "We value ownership, clear writing and kindness. " * 4
+
+
+def make_postings(n: int, seed: int = SEED) -> list[dict]:
+    rng = random.Random(seed)
+    titles, title_w = zip(*TITLES)
+    locations, location_w = zip(*LOCATIONS)
+    today = date.today()
+    postings = []
+    for i, (title, location) in enumerate(zip(
+        rng.choices(titles, title_w, k=n), rng.choices(locations, location_w, k=n),
+    )):
+        team = TEAMS[i % len(TEAMS)]
+        postings.append({
+            "id": 10_000_000 + i,
+            "title": f"{title}, {team}" if i % 3 else title,
+            "location": location,
+            # newest first, spread over the last year
+            "posted": today - timedelta(days=int(365 * i / max(n, 1))),
+            "description": DESCRIPTION.format(
+                team=team, id=i, years=rng.choice(["0-2", "1+", "3+", "5+", "8+"]), filler=FILLER,
+            ),
+        })
+    return postings
+
+
+def _gh_offices(location: str) -> list[dict]:
+    return [{"name": "US"}] if location.endswith(("CA", "NY", "WA", "TX", "US")) else [{"name": location}]
+
+
+def render(provider: str, postings: list[dict], base: str, content: bool = False) -> object:
+    """Serializes postings the way `provider`'s board endpoint does."""
+    if provider == "greenhouse":
+        jobs = []
+        for p in postings:
+            job = {
+                "id": p["id"],
+                "title": p["title"],
+                "updated_at": f"{p['posted']}T12:00:00-04:00",
+                "first_published": f"{p['posted']}T09:00:00-04:00",
+                "absolute_url": f"{base}/greenhouse/jobs/{p['id']}",
+                "location": {"name": p["location"]},
+            }
+            if content:
+                job["content"] = p["description"]
+                job["offices"] = _gh_offices(p["location"])
+            jobs.append(job)
+        return {"jobs": jobs, "meta": {"total": len(jobs)}}
+    if provider == "lever":
+        return [{
+            "id": f"lever-{p['id']}",
+            "text": p["title"],
+            "categories": {"location": p["location"], "team": "Engineering"},
+            "createdAt": int(time.mktime(p["posted"].timetuple()) * 1000),
+            "hostedUrl": f"{base}/lever/jobs/{p['id']}",
+            "description": p["description"],
+        } for p in postings]
+    if provider == "ashby":
+        return {"jobs": [{
+            "id": f"ashby-{p['id']}",
+            "title": p["title"],
+            "location": p["location"],
+            "publishedAt": f"{p['posted']}T12:00:00.000+00:00",
+            "jobUrl": f"{base}/ashby/jobs/{p['id']}",
+            "descriptionHtml": p["description"],
+        } for p in postings]}
+    if provider == "smartrecruiters":
+        return [{
+            "id": str(p["id"]),
+            "name": p["title"],
+            "location": dict(zip(("city", "region", "country"), (p["location"].split(", ") + ["", ""])[:3])),
+            "releasedDate": f"{p['posted']}T12:00:00.000Z",
+        } for p in postings]
+    if provider == "workday":
+        today = date.today()
+        return [{
+            "title": p["title"],
+            "externalPath": f"/job/{p['location'].split(',')[0].replace(' ', '-')}/Job_{p['id']}",
+            "locationsText": p["location"],
+            "postedOn": _workday_posted_on((today - p["posted"]).days),
+        } for p in postings]
+    if provider == "adzuna":
+        return [{
+            "id": str(p["id"]),
+            "title": p["title"],
+            "company": {"display_name": f"Bench Co {p['id'] % 500}"},
+            "location": {"display_name": p["location"]},
+            "created": f"{p['posted']}T12:00:00Z",
+            "redirect_url": f"{base}/adzuna/land/{p['id']}",
+        } for p in postings]
+    raise ValueError(provider)
+
+
+def _workday_posted_on(days: int) -> str:
+    if days == 0:
+        return "Posted Today"
+    if days > 30:
+        return "Posted 30+ Days Ago"
+    return f"Posted {days} Day{'s' if days > 1 else ''} Ago"
+
+
+# ── Local HTTP stand-in ──────────────────────────────────────────────────────
+
+class StandIn(http.server.ThreadingHTTPServer):
+    """Serves one provider at one size; payload bytes are built once and reused."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.base = f"http://127.0.0.1:{self.server_port}"
+        self.provider = ""
+        self.postings: list[dict] = []
+        self._rendered: dict = {}
+        self._lock = threading.Lock()
+
+    def load(self, provider: str, size: int) -> None:
+        self.provider = provider
+        self.postings = make_postings(size)
+        self._rendered = {}
+
+    def rendered(self, key, build) -> bytes:
+        with self._lock:
+            body = self._rendered.get(key)
+            if body is None:
+                body = self._rendered[key] = json.dumps(build()).encode("utf-8")
+            return body
+
+    def items(self, provider: str) -> list:
+        """Unencoded page items for paginated providers, built once per size."""
+        with self._lock:
+            items = self._rendered.get(("items", provider))
+            if items is None:
+                items = self._rendered[("items", provider)] = render(provider, self.postings, self.base)
+            return items
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+    server: StandIn
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body: bytes, status: int = 200) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        query = urllib.parse.parse_qs(url.query)
+        parts = url.path.strip("/").split("/")
+        srv = self.server
+
+        if parts[0] == "greenhouse" and len(parts) == 6:  # /greenhouse/v1/boards/{t}/jobs/{id}
+            idx = int(parts[5]) - 10_000_000
+            if not 0 <= idx < len(srv.postings):
+                return self._send(b"{}", 404)
+            p = srv.postings[idx]
+            return self._send(json.dumps({
+                "id": p["id"], "content": p["description"],
+                "offices": _gh_offices(p["location"]), "location": {"name": p["location"]},
+            }).encode("utf-8"))
+        if parts[0] == "greenhouse":
+            content = query.get("content") == ["true"]
+            return self._send(srv.rendered(
+                ("greenhouse", content), lambda: render("greenhouse", srv.postings, srv.base, content),
+            ))
+        if parts[0] in ("lever", "ashby"):
+            return self._send(srv.rendered(parts[0], lambda: render(parts[0], srv.postings, srv.base)))
+        if parts[0] == "smartrecruiters":
+            offset = int(query.get("offset", ["0"])[0])
+            limit = int(query.get("limit", ["100"])[0])
+            items = srv.items("smartrecruiters")
+            return self._send(json.dumps({
+                "offset": offset, "limit": limit, "totalFound": len(items),
+                "content": items[offset:offset + limit],
+            }).encode("utf-8"))
+        if parts[0] == "adzuna":
+            # One slice per search query; the real API caps a page at 50 results
+            from providers.adzuna import SEARCH_QUERIES
+            what = query.get("what", [""])[0]
+            i = SEARCH_QUERIES.index(what) if what in SEARCH_QUERIES else 0
+            return self._send(srv.rendered(("adzuna", i), lambda: {
+                "results": render("adzuna", srv.postings[i::len(SEARCH_QUERIES)], srv.base),
+            }))
+        self._send(b"{}", 404)
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.startswith("/workday/"):
+            return self._send(b"{}", 404)
+        offset, limit = payload.get("offset", 0), payload.get("limit", 20)
+        items = self.server.items("workday")
+        self._send(json.dumps({
+            "total": len(items), "jobPostings": items[offset:offset + limit], "facets": [],
+        }).encode("utf-8"))
+
+
+# ── Worker: one (provider, size) pair in a fresh process ─────────────────────
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_worker(provider: str, size: int, base: str, trace_memory: bool) -> dict:
+    # Keep the benchmark away from the real caches and state
+    os.environ["JOB_RADAR_HTTP_CACHE"] = ""
+    os.environ["JOB_RADAR_DESC_CACHE"] = ""
+    import asyncio
+    import logging
+    import tracemalloc
+
+    logging.basicConfig(level=logging.WARNING)
+    if trace_memory:
+        tracemalloc.start()
+
+    import metrics
+    from diff import diff_jobs, save_state
+    from filter import filter_batch
+    from providers import adzuna, ashby, greenhouse, lever, smartrecruiters, workday
+
+    greenhouse.LIST_URL = base + "/greenhouse/v1/boards/{token}/jobs"
+    greenhouse.BASE_URL = greenhouse.LIST_URL + "?content=true"
+    greenhouse.JOB_URL = greenhouse.LIST_URL + "/{job_id}"
+    lever.BASE_URL = base + "/lever/v0/postings/{company_id}?mode=json"
+    ashby.BASE_URL = base + "/ashby/posting-api/job-board/{company_id}"
+    smartrecruiters.BASE_URL = base + "/smartrecruiters/v1/companies/{company_id}/postings"
+    adzuna.BASE_URL = base + "/adzuna/v1/api/jobs/us/search/{page}"
+    adzuna.ADZUNA_APP_ID = adzuna.ADZUNA_APP_KEY = "bench"
+
+    cfg = {"name": "Bench Co", "id": "bench", "url": base + "/workday/wday/cxs/bench/Site/jobs"}
+    fetchers = {
+        "greenhouse": greenhouse.fetch_async,
+        "lever": lever.fetch_async,
+        "ashby": ashby.fetch_async,
+        "smartrecruiters": smartrecruiters.fetch_async,
+        "workday": workday.fetch_async,
+        "adzuna": lambda _cfg: adzuna.fetch_jobs_async(),
+    }
+    timings: dict[str, float] = {}
+
+    def timed(name, fn, *args, **kwargs):
+        started = time.perf_counter()
+        result = fn(*args, **kwargs)
+        timings[name] = round(time.perf_counter() - started, 4)
+        return result
+
+    async def fetch():
+        metrics.company.set(cfg["name"])
+        return await fetchers[provider](cfg)
+
+    metrics.reset()
+    jobs = timed("fetch", asyncio.run, fetch())
+    stats = metrics.report()["companies"].get(cfg["name"], {})
+    timings["parse"] = round(stats.get("parse_s", 0.0), 4)
+
+    mask, _ = timed("filter", filter_batch, jobs)
+    kept = [j for j, keep in zip(jobs, mask) if keep]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        state = os.path.join(tmp, "jobs_seen.db")
+        logging.getLogger("diff").setLevel(logging.WARNING)
+        # Every fetched job, not just the kept ones, so diff/save see realistic volume
+        result = timed("diff", diff_jobs, jobs, state_path=state)
+        timed("save", save_state, result, path=state)
+        result = timed("diff2", diff_jobs, jobs, state_path=state)
+        timed("save2", save_state, result, path=state)
+
+    out = {
+        "provider": provider,
+        "size": size,
+        "jobs": len(jobs),
+        "kept": len(kept),
+        "requests": stats.get("requests", 0),
+        "bytes": stats.get("bytes", 0),
+        **timings,
+        "fetch_jobs_per_s": round(len(jobs) / timings["fetch"]) if timings["fetch"] else None,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+    if trace_memory:
+        out["tracemalloc_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+    return out
+
+
+# ── Driver ───────────────────────────────────────────────────────────────────
+
+COLUMNS = ["provider", "size", "jobs", "kept", "requests", "fetch", "parse", "filter",
+           "diff", "save", "diff2", "save2", "fetch_jobs_per_s", "peak_rss_mb"]
+
+
+def _print_row(row: dict, columns: list[str], header: bool = False) -> None:
+    cells = []
+    for col in columns:
+        value = col if header else row.get(col)
+        if isinstance(value, float):
+            value = f"{value:.0f}" if col.endswith("_mb") else f"{value:.3f}"
+        cells.append(f"{'' if value is None else value:>{16 if col == 'provider' else 9}}")
+    print(" ".join(cells), flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline Job Radar pipeline benchmark")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated posting counts per provider (default: %(default)s)")
+    parser.add_argument("--providers", default=",".join(PROVIDERS),
+                        help="Comma-separated providers (default: all)")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--trace-memory", action="store_true", help="Also report tracemalloc peak")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)   # provider:size:base_url
+    args = parser.parse_args()
+
+    if args.worker:
+        provider, size, base = args.worker.split(":", 2)
+        print(json.dumps(run_worker(provider, int(size), base, args.trace_memory)))
+        return
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    providers = [p for p in args.providers.split(",") if p]
+    unknown = set(providers) - set(PROVIDERS)
+    if unknown:
+        parser.error(f"unknown providers: {', '.join(sorted(unknown))}")
+
+    server = StandIn()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    here = os.path.dirname(os.path.abspath(__file__))
+
+    columns = COLUMNS + (["tracemalloc_peak_mb"] if args.trace_memory else [])
+    results = []
+    _print_row({}, columns, header=True)
+    try:
+        for size in sizes:
+            for provider in providers:
+                server.load(provider, size)
+                cmd = [sys.executable, os.path.abspath(__file__), "--worker", f"{provider}:{size}:{server.base}"]
+                if args.trace_memory:
+                    cmd.append("--trace-memory")
+                proc = subprocess.run(cmd, cwd=here, capture_output=True, text=True)
+                if proc.returncode != 0:
+                    print(f"{provider} @ {size}: worker failed\n{proc.stderr}", file=sys.stderr)
+                    continue
+                row = json.loads(proc.stdout.strip().splitlines()[-1])
+                results.append(row)
+                _print_row(row, columns)
+    finally:
+        server.shutdown()
+
+    if args.output:
+        from fileio import write_json
+        write_json(args.output, {"generated_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "results": results}, indent=2)
+        print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
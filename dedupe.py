@@ -0,0 +1,148 @@
+"""
+dedupe.py
+Collapses the same role reported by more than one provider (e.g. a company's
+ATS board and Adzuna, or a company listed on two ATSes) before diffing.
+
+Each job gets a few fingerprints:
+    - company + title + city   (normalized; an unknown city matches any city)
+    - apply URL host + path    (skipped for aggregator redirect links)
+
+Fingerprints are 16-byte hashes held in a dict for the current batch and in
+the state store's `fingerprints` table across runs, so collapsing stays
+linear in the batch size. Jobs from ATS boards win over aggregator copies;
+two jobs from the same provider are never merged, since distinct ids on one
+board are distinct postings.
+"""
+
+import hashlib
+import logging
+import re
+from typing import Optional
+from urllib.parse import urlsplit
+
+from diff import DEFAULT_STATE_FILE, StateStore
+
+logger = logging.getLogger(__name__)
+
+# Lower rank wins when two providers report the same role
+AGGREGATOR_PROVIDERS = {"adzuna"}
+# Apply links on these hosts are redirects, not the posting itself
+REDIRECT_HOSTS = {"www.adzuna.com", "adzuna.com"}
+
+_COMPANY_SUFFIXES = re.compile(
+    r"\b(?:inc|llc|ltd|limited|corp|corporation|co|company|plc|gmbh|technologies|labs)\b"
+)
+_COUNTRY_WORDS = re.compile(r"\b(?:united states(?: of america)?|usa|us|remote)\b")
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+WILDCARD = "*"
+
+
+def _norm(text: Optional[str]) -> str:
+    return _NON_ALNUM.sub(" ", (text or "").lower()).strip()
+
+
+def normalize_company(company: Optional[str]) -> str:
+    return _norm(_COMPANY_SUFFIXES.sub(" ", (company or "").lower()))
+
+
+def normalize_city(location: Optional[str]) -> str:
+    """First location segment without country qualifiers, e.g. 'San Francisco, CA' → 'san francisco'."""
+    first = (location or "").split(",")[0].split(";")[0].lower()
+    return _norm(_COUNTRY_WORDS.sub(" ", first))
+
+
+def _digest(*parts: str) -> bytes:
+    return hashlib.blake2b("\0".join(parts).encode("utf-8"), digest_size=16).digest()
+
+
+def provider_rank(job: dict) -> int:
+    return 1 if job.get("provider") in AGGREGATOR_PROVIDERS else 0
+
+
+def fingerprints(job: dict) -> tuple[list[bytes], list[bytes]]:
+    """
+    Returns (keys to index this job under, keys to look duplicates up by).
+    A job with no city is indexed under its own empty-city key and looks up
+    the wildcard key that every job with a known city is also indexed under.
+    """
+    company = normalize_company(job.get("company"))
+    title = _norm(job.get("title"))
+    city = normalize_city(job.get("location"))
+
+    index_keys = [_digest("t", company, title, city)]
+    if city:
+        index_keys.append(_digest("t", company, title, WILDCARD))
+        lookup_keys = [_digest("t", company, title, city), _digest("t", company, title, "")]
+    else:
+        lookup_keys = [_digest("t", company, title, ""), _digest("t", company, title, WILDCARD)]
+
+    url = urlsplit(job.get("apply_url") or "")
+    if url.hostname and url.hostname not in REDIRECT_HOSTS:
+        url_key = _digest("u", url.hostname.lower(), url.path.rstrip("/").lower())
+        index_keys.append(url_key)
+        lookup_keys.append(url_key)
+    return index_keys, lookup_keys
+
+
+def _is_duplicate(job: dict, owner: Optional[tuple[str, str]]) -> bool:
+    if owner is None:
+        return False
+    owner_id, owner_provider = owner
+    return (
+        owner_id != job.get("job_id")
+        and owner_provider != job.get("provider")
+        and provider_rank({"provider": owner_provider}) <= provider_rank(job)
+    )
+
+
+class Deduper:
+    """
+    Collapses duplicates batch by batch as a scan streams in. add() returns
+    the jobs to diff (ATS sources first) and collects the rest in
+    `duplicates`. The in-run index persists across add() calls, so
+    higher-priority providers must be added first: a job is only checked
+    against jobs added before it (and the store). The store stays open
+    until close(), like Differ's.
+    """
+
+    def __init__(self, state_path: Optional[str] = DEFAULT_STATE_FILE):
+        self.store = StateStore(state_path) if state_path else None
+        self.index: dict[bytes, tuple[str, str]] = {}
+        self.duplicates: list[dict] = []
+
+    def add(self, jobs: list[dict]) -> list[dict]:
+        """Returns the jobs in `jobs` not already reported by a higher-or-equal priority provider."""
+        ordered = sorted(jobs, key=provider_rank)  # stable: keeps provider order otherwise
+        keyed = [(job, *fingerprints(job)) for job in ordered]
+
+        stored: dict[bytes, tuple[str, str]] = {}
+        if self.store is not None and keyed:
+            stored = self.store.fingerprint_owners({k for _, _, lookup in keyed for k in lookup})
+
+        index = self.index
+        kept = []
+        for job, index_keys, lookup_keys in keyed:
+            if any(_is_duplicate(job, index.get(k)) or _is_duplicate(job, stored.get(k)) for k in lookup_keys):
+                self.duplicates.append(job)
+                continue
+            kept.append(job)
+            owner = (job.get("job_id"), job.get("provider"))
+            for k in index_keys:
+                index.setdefault(k, owner)
+        return kept
+
+    def close(self) -> None:
+        if self.store is not None:
+            self.store.close()
+
+
+def save_fingerprints(jobs: list[dict], state_path: str = DEFAULT_STATE_FILE) -> None:
+    """Records the fingerprints of tracked jobs so later runs dedupe against them."""
+    rows = [
+        (key, job["job_id"], job.get("provider"))
+        for job in jobs if job.get("job_id")
+        for key in fingerprints(job)[0]
+    ]
+    with StateStore(state_path) as store:
+        store.upsert_fingerprints(rows)
@@ -1,53 +1,519 @@
 """
 diff.py
-Compares freshly fetched jobs against the last saved snapshot.
-Returns only jobs not seen before.
+Compares freshly fetched jobs against the seen-jobs state store and
+classifies each one as new, changed or unchanged by content hash. Tracked
+jobs that vanished from a board scanned this run are reported as closed.
+
+State lives in SQLite (state/jobs_seen.db) with job_id as the primary key,
+so each run only looks up the ids in the current batch and upserts them in
+one transaction — load time stays flat as the history grows. A legacy
+state/jobs_seen.json is imported the first time the database is created.
+
+In the default compact mode a row is just job_id, 16-byte content and
+description hashes, the board it was listed on and timestamps; JOB_RADAR_STATE_MODE=full also keeps the normalized job
+JSON. Opening a store in compact mode strips job JSON left by full mode.
+
+Retention: save_state drops jobs not seen for JOB_RADAR_RETENTION_DAYS
+(default 90, 0 = keep forever) and, if JOB_RADAR_MAX_JOBS is set, the
+least recently seen jobs beyond that cap.
+
+The same database holds per-company fetch watermarks, which main.py passes
+to providers that can stop paging at already-seen postings, and the scan
+schedule kept by scheduler.py.
 """
 
+import hashlib
 import json
 import logging
+import os
+import sqlite3
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import Iterable, NamedTuple, Optional
+
+from fileio import json_default
 
 logger = logging.getLogger(__name__)
 
-DEFAULT_STATE_FILE = "state/jobs_seen.json"
+DEFAULT_STATE_FILE = "state/jobs_seen.db"
+STATE_MODE = os.environ.get("JOB_RADAR_STATE_MODE", "compact")   # compact | full
+RETENTION_DAYS = int(os.environ.get("JOB_RADAR_RETENTION_DAYS", "90"))
+MAX_JOBS = int(os.environ.get("JOB_RADAR_MAX_JOBS", "0"))
+# A closed job listed again within this many days is a reopening (diffed as
+# usual), not a new posting — boards drop postings transiently
+REOPEN_GRACE_DAYS = float(os.environ.get("JOB_RADAR_REOPEN_GRACE_DAYS", "7"))
 
+# Fields that make up a posting's content — posted_at is left out because
+# Workday's relative dates ("Posted 3 Days Ago") drift every day. The
+# description is hashed separately: it can be missing when a hydration or
+# scrape fails, which must not read as an edit.
+HASH_FIELDS = ("title", "location", "apply_url")
 
-def load_state(path: str = DEFAULT_STATE_FILE) -> dict[str, dict]:
-    p = Path(path)
-    if not p.exists():
-        logger.info(f"No state file found at {path} — treating all jobs as new.")
-        return {}
-    with open(p) as f:
-        return json.load(f)
+# SQLite's default host-parameter limit is 999 on older builds
+_QUERY_CHUNK = 500
 
+# In-memory copies of state databases held by daemon mode, keyed by path
+_IN_MEMORY: dict[str, sqlite3.Connection] = {}
 
-def save_state(jobs: dict[str, dict], path: str = DEFAULT_STATE_FILE) -> None:
-    Path(path).parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w") as f:
-        json.dump(jobs, f, indent=2, default=str)
-    logger.info(f"State saved: {len(jobs)} total jobs tracked in {path}")
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id        TEXT PRIMARY KEY,
+    first_seen    TEXT NOT NULL,
+    last_seen     TEXT NOT NULL,
+    content_hash      BLOB,
+    description_hash  BLOB,
+    data              TEXT,
+    board             TEXT,
+    closed_at         TEXT
+) WITHOUT ROWID;
 
+-- Cross-provider duplicate keys (see dedupe.py) → the job that owns them
+CREATE TABLE IF NOT EXISTS fingerprints (
+    key       BLOB PRIMARY KEY,
+    job_id    TEXT NOT NULL,
+    provider  TEXT
+) WITHOUT ROWID;
 
-def find_new_jobs(
-    current_jobs: list[dict],
-    state_path: str = DEFAULT_STATE_FILE,
-) -> tuple[list[dict], dict[str, dict]]:
+-- Per-company fetch watermarks: newest posted_at date seen, last full scan
+CREATE TABLE IF NOT EXISTS watermarks (
+    company       TEXT PRIMARY KEY,
+    watermark     TEXT,
+    full_scan_at  TEXT
+) WITHOUT ROWID;
+
+-- Per-company scan schedule (see scheduler.py)
+CREATE TABLE IF NOT EXISTS schedule (
+    company      TEXT PRIMARY KEY,
+    change_rate  REAL NOT NULL,
+    skipped      INTEGER NOT NULL DEFAULT 0,
+    scanned_at   TEXT
+) WITHOUT ROWID;
+"""
+
+# Created after _upgrade, since older stores lack some of these columns
+INDEXES = """
+CREATE INDEX IF NOT EXISTS jobs_last_seen ON jobs (last_seen);
+CREATE INDEX IF NOT EXISTS jobs_board ON jobs (board) WHERE closed_at IS NULL;
+"""
+
+# PRAGMA user_version: whether job JSON may still be stored. Compaction runs
+# once when a compact-mode store is at _MAY_HOLD_DATA, then records _COMPACTED;
+# opening in full mode drops back to _MAY_HOLD_DATA.
+_MAY_HOLD_DATA = 0
+_COMPACTED = 1
+
+# Columns added since the first SQLite release, with their types
+_ADDED_COLUMNS = {
+    "content_hash": "BLOB",
+    "description_hash": "BLOB",
+    "board": "TEXT",
+    "closed_at": "TEXT",
+}
+
+
+class DiffResult(NamedTuple):
+    new: list[dict]        # not tracked, or re-posted long after closing (REOPEN_GRACE_DAYS)
+    changed: list[dict]    # tracked, but title/location/url/description differ
+    unchanged: list[dict]
+    closed: list[str]      # job_ids no longer listed on a board scanned this run
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def content_hash(job: dict) -> Optional[bytes]:
     """
-    Returns:
-        new_jobs   — jobs not in the previous snapshot
-        new_state  — updated state dict to persist
+    16-byte digest of the fields that make up a posting's content, or None
+    for an incomplete Job whose fields are provisional.
     """
-    seen = load_state(state_path)
-    new_jobs = []
-    updated_state = dict(seen)
+    if getattr(job, "incomplete", False):
+        return None
+    h = hashlib.blake2b(digest_size=16)
+    for field in HASH_FIELDS:
+        h.update(str(job.get(field) or "").encode("utf-8"))
+        h.update(b"\0")
+    return h.digest()
+
+
+def description_hash(job: dict) -> Optional[bytes]:
+    """Like content_hash: None for an incomplete Job or a missing description."""
+    if getattr(job, "incomplete", False):
+        return None
+    description = job.get("description")
+    if not description:
+        return None
+    return hashlib.blake2b(description.encode("utf-8"), digest_size=16).digest()
+
+
+def board_key(job: dict) -> str:
+    """Identifies the board a job was listed on, e.g. 'greenhouse:Stripe'."""
+    return f"{job.get('provider', '')}:{job.get('company', '')}"
+
+
+def company_key(company_cfg: dict) -> str:
+    """Identifies a companies.yaml entry, e.g. 'workday_url:Nvidia'."""
+    return f"{company_cfg.get('provider', '')}:{company_cfg.get('name', '')}"
+
+
+class StateStore:
+    """SQLite-backed set of seen jobs, keyed by job_id."""
+
+    def __init__(self, path: str = DEFAULT_STATE_FILE, mode: str = STATE_MODE):
+        if path.endswith(".json"):
+            legacy, path = path, path[:-len(".json")] + ".db"
+        else:
+            legacy = str(Path(path).with_suffix(".json"))
+
+        self.path = path
+        self.mode = mode
+        self._shared = path in _IN_MEMORY
+        if self._shared:
+            self.conn = _IN_MEMORY[path]
+            return
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        is_new = not Path(path).exists()
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        if not is_new:
+            self._upgrade()
+        elif mode == "compact":
+            self.conn.execute(f"PRAGMA user_version = {_COMPACTED}")
+        self.conn.executescript(INDEXES)
+        if is_new:
+            if Path(legacy).exists():
+                self._migrate_json(legacy)
+            else:
+                logger.info(f"No state found at {path} — treating all jobs as new.")
+
+    def _row(self, job: dict, now: str) -> tuple:
+        data = json.dumps(job, default=json_default) if self.mode == "full" else None
+        return (job["job_id"], now, now, content_hash(job), description_hash(job), data, board_key(job))
+
+    def _upgrade(self) -> None:
+        """Brings stores written by older versions (or by full mode) up to date."""
+        columns = {r[1] for r in self.conn.execute("PRAGMA table_info(jobs)")}
+        with self.conn:
+            for column, sql_type in _ADDED_COLUMNS.items():
+                if column not in columns:
+                    self.conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {sql_type}")
+            if "description_hash" not in columns:
+                # Earlier hashes covered the description too; re-baseline on next sight
+                self.conn.execute("UPDATE jobs SET content_hash = NULL")
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if self.mode != "compact":
+            if version != _MAY_HOLD_DATA:
+                self.conn.execute(f"PRAGMA user_version = {_MAY_HOLD_DATA}")
+            return
+        if version == _COMPACTED:
+            return  # no full scan of jobs on every open
+        rows = self.conn.execute("SELECT job_id, data FROM jobs WHERE data IS NOT NULL").fetchall()
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE jobs SET content_hash = ?, description_hash = ?, data = NULL WHERE job_id = ?",
+                ((content_hash(job), description_hash(job), jid)
+                 for jid, job in ((jid, json.loads(data)) for jid, data in rows)),
+            )
+            self.conn.execute(f"PRAGMA user_version = {_COMPACTED}")
+        if rows:
+            self.conn.execute("VACUUM")
+            logger.info(f"Compacted {len(rows)} stored jobs to hashes in {self.path}")
+
+    def _migrate_json(self, legacy_path: str) -> None:
+        with open(legacy_path) as f:
+            legacy = json.load(f)
+        now = _now()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO jobs "
+                "(job_id, first_seen, last_seen, content_hash, description_hash, data, board) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self._row({**job, "job_id": jid}, now) for jid, job in legacy.items()),
+            )
+        logger.info(f"Migrated {len(legacy)} jobs from {legacy_path} into {self.path}")
+
+    def _chunked(self, sql: str, values: list) -> Iterable[tuple]:
+        """Runs `sql` (containing one `IN ({marks})`) over `values` in parameter-limit chunks."""
+        for i in range(0, len(values), _QUERY_CHUNK):
+            chunk = values[i:i + _QUERY_CHUNK]
+            yield from self.conn.execute(sql.format(marks=",".join("?" * len(chunk))), chunk)
+
+    def seen_ids(self, job_ids: Iterable[str]) -> set[str]:
+        """Returns the subset of `job_ids` already in the store."""
+        return {r[0] for r in self._chunked("SELECT job_id FROM jobs WHERE job_id IN ({marks})", list(job_ids))}
+
+    def lookup(self, job_ids: Iterable[str]) -> dict[str, tuple]:
+        """
+        Returns {job_id: (content_hash, description_hash, closed_at)} for the
+        tracked subset of `job_ids`.
+        """
+        sql = "SELECT job_id, content_hash, description_hash, closed_at FROM jobs WHERE job_id IN ({marks})"
+        return {row[0]: row[1:] for row in self._chunked(sql, list(job_ids))}
+
+    def open_ids(self, boards: Iterable[str]) -> set[str]:
+        """Returns ids of jobs on `boards` that are not marked closed."""
+        sql = "SELECT job_id FROM jobs WHERE closed_at IS NULL AND board IN ({marks})"
+        return {r[0] for r in self._chunked(sql, list(boards))}
 
-    for job in current_jobs:
-        jid = job.get("job_id")
-        if not jid:
-            continue
-        if jid not in seen:
-            new_jobs.append(job)
-        updated_state[jid] = job
+    def upsert(self, jobs: Iterable[dict], now: Optional[str] = None) -> int:
+        """
+        Inserts new jobs and refreshes last_seen/hash/data for known ones, in
+        one transaction. Jobs seen again are reopened (closed_at cleared).
+        A job without a content or description hash keeps the stored one.
+        """
+        now = now or _now()
+        rows = [self._row(job, now) for job in jobs if job.get("job_id")]
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT INTO jobs
+                    (job_id, first_seen, last_seen, content_hash, description_hash, data, board)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(job_id) DO UPDATE SET
+                    last_seen = excluded.last_seen,
+                    content_hash = COALESCE(excluded.content_hash, jobs.content_hash),
+                    description_hash = COALESCE(excluded.description_hash, jobs.description_hash),
+                    data = excluded.data,
+                    board = excluded.board,
+                    closed_at = NULL
+                """,
+                rows,
+            )
+        return len(rows)
 
-    return new_jobs, updated_state
+    def fingerprint_owners(self, keys: Iterable[bytes]) -> dict[bytes, tuple[str, str]]:
+        """Returns {key: (job_id, provider)} for the stored subset of `keys`."""
+        sql = "SELECT key, job_id, provider FROM fingerprints WHERE key IN ({marks})"
+        return {key: (jid, provider) for key, jid, provider in self._chunked(sql, list(keys))}
+
+    def upsert_fingerprints(self, rows: Iterable[tuple[bytes, str, str]]) -> None:
+        """Rows are (key, job_id, provider); a later owner of a key replaces the earlier one."""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO fingerprints (key, job_id, provider) VALUES (?, ?, ?)",
+                rows,
+            )
+
+    def watermarks(self, companies: Iterable[str]) -> dict[str, tuple[Optional[str], Optional[str]]]:
+        """Returns {company: (watermark, full_scan_at)} for the tracked subset of `companies`."""
+        sql = "SELECT company, watermark, full_scan_at FROM watermarks WHERE company IN ({marks})"
+        return {row[0]: row[1:] for row in self._chunked(sql, list(companies))}
+
+    def save_watermarks(self, rows: Iterable[tuple[str, Optional[str], bool]], now: Optional[str] = None) -> None:
+        """
+        Rows are (company, newest posted_at date fetched, whether the fetch
+        was a full scan). Watermarks only move forward.
+        """
+        now = now or _now()
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT INTO watermarks (company, watermark, full_scan_at) VALUES (?, ?, ?)
+                ON CONFLICT(company) DO UPDATE SET
+                    watermark = CASE
+                        WHEN watermarks.watermark IS NULL OR excluded.watermark > watermarks.watermark
+                        THEN excluded.watermark ELSE watermarks.watermark END,
+                    full_scan_at = COALESCE(excluded.full_scan_at, watermarks.full_scan_at)
+                """,
+                ((company, mark, now if full else None) for company, mark, full in rows),
+            )
+
+    def schedule(self, companies: Iterable[str]) -> dict[str, tuple[float, int]]:
+        """Returns {company: (change_rate, runs skipped since last scan)} for tracked companies."""
+        sql = "SELECT company, change_rate, skipped FROM schedule WHERE company IN ({marks})"
+        return {row[0]: row[1:] for row in self._chunked(sql, list(companies))}
+
+    def save_schedule(
+        self,
+        scanned: Iterable[tuple[str, float]],
+        skipped: Iterable[str],
+        now: Optional[str] = None,
+    ) -> None:
+        """`scanned` rows are (company, new change_rate); `skipped` companies were not due."""
+        now = now or _now()
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT INTO schedule (company, change_rate, skipped, scanned_at) VALUES (?, ?, 0, ?)
+                ON CONFLICT(company) DO UPDATE SET
+                    change_rate = excluded.change_rate,
+                    skipped = 0,
+                    scanned_at = excluded.scanned_at
+                """,
+                ((company, rate, now) for company, rate in scanned),
+            )
+            self.conn.executemany(
+                "UPDATE schedule SET skipped = skipped + 1 WHERE company = ?",
+                ((company,) for company in skipped),
+            )
+
+    def mark_closed(self, job_ids: Iterable[str], now: Optional[str] = None) -> None:
+        now = now or _now()
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE jobs SET closed_at = ? WHERE job_id = ?",
+                ((now, jid) for jid in job_ids),
+            )
+
+    def apply_retention(self, retention_days: int = RETENTION_DAYS, max_jobs: int = MAX_JOBS) -> int:
+        """Deletes stale and over-cap jobs. Returns the number of rows removed."""
+        removed = 0
+        with self.conn:
+            if retention_days > 0:
+                cutoff = (datetime.now(timezone.utc) - timedelta(days=retention_days)).isoformat(timespec="seconds")
+                removed += self.conn.execute("DELETE FROM jobs WHERE last_seen < ?", (cutoff,)).rowcount
+            if max_jobs > 0:
+                excess = self.count() - max_jobs
+                if excess > 0:
+                    removed += self.conn.execute(
+                        "DELETE FROM jobs WHERE job_id IN "
+                        "(SELECT job_id FROM jobs ORDER BY last_seen LIMIT ?)",
+                        (excess,),
+                    ).rowcount
+            if removed:
+                self.conn.execute(
+                    "DELETE FROM fingerprints WHERE job_id NOT IN (SELECT job_id FROM jobs)"
+                )
+        return removed
+
+    def compact(self) -> tuple[int, int, int]:
+        """
+        Applies retention and rewrites the database file.
+        Returns (jobs removed, size before, size after) in bytes.
+        """
+        before = Path(self.path).stat().st_size
+        removed = self.apply_retention()
+        self.conn.execute("VACUUM")
+        return removed, before, Path(self.path).stat().st_size
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def close(self) -> None:
+        if not self._shared:
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def hold_in_memory(path: str = DEFAULT_STATE_FILE) -> str:
+    """
+    Loads the state database into memory; every StateStore opened on `path`
+    afterwards shares that copy until checkpoint() writes it back.
+    Returns the database path (legacy .json paths resolve to .db).
+    """
+    with StateStore(path) as store:  # creates, migrates and upgrades on disk first
+        path = store.path
+        memory = sqlite3.connect(":memory:")
+        store.conn.backup(memory)
+    _IN_MEMORY[path] = memory
+    logger.info(f"Holding {path} in memory")
+    return path
+
+
+def checkpoint(path: str = DEFAULT_STATE_FILE) -> None:
+    """Copies an in-memory state database back to disk in one transaction."""
+    memory = _IN_MEMORY.get(path)
+    if memory is None:
+        return
+    disk = sqlite3.connect(path)
+    try:
+        memory.backup(disk)
+    finally:
+        disk.close()
+    logger.info(f"Checkpointed state to {path}")
+
+
+def save_state(result: DiffResult, path: str = DEFAULT_STATE_FILE) -> None:
+    with StateStore(path) as store:
+        store.upsert(result.new + result.changed + result.unchanged)
+        store.mark_closed(result.closed)
+        removed = store.apply_retention()
+        if removed:
+            logger.info(f"Retention: dropped {removed} stale jobs")
+        logger.info(f"State saved: {store.count()} total jobs tracked in {store.path}")
+
+
+class Differ:
+    """
+    Incremental diff_jobs for a streaming scan: add() classifies each batch
+    as it arrives, touching only that batch's ids, and finish() reports the
+    closed jobs once every board is in. A job counts as still open if it
+    was listed at all — also when the filter or dedupe kept it out of add().
+
+    In compact mode an unchanged job's description is dropped once its hash
+    matches the stored one — nothing downstream needs it, and the store
+    keeps the existing hash when the upsert carries none.
+    """
+
+    def __init__(self, state_path: str = DEFAULT_STATE_FILE):
+        self.store = StateStore(state_path)
+        self.result = DiffResult([], [], [], [])
+        self._seen: set[str] = set()
+        self._listed: set[str] = set()
+        self._reopen_cutoff = (
+            datetime.now(timezone.utc) - timedelta(days=REOPEN_GRACE_DAYS)
+        ).isoformat(timespec="seconds")
+
+    def listed(self, job_ids: Iterable[str]) -> None:
+        """Records ids seen in a complete board listing, before any filtering."""
+        self._listed.update(job_ids)
+
+    def add(self, jobs: Iterable[dict]) -> None:
+        batch: dict[str, dict] = {}
+        for job in jobs:
+            jid = job.get("job_id")
+            if jid and jid not in self._seen:
+                batch[jid] = job
+        self._seen.update(batch)
+        known = self.store.lookup(batch)
+
+        result = self.result
+        for jid, job in batch.items():
+            stored = known.get(jid)
+            if stored is None or (stored[2] is not None and stored[2] < self._reopen_cutoff):
+                result.new.append(job)
+                continue
+            stored_content, stored_desc, _ = stored
+            desc = description_hash(job)
+            content = content_hash(job)
+            if (stored_content is not None and content is not None and stored_content != content) or (
+                desc is not None and stored_desc is not None and stored_desc != desc
+            ):
+                result.changed.append(job)
+                continue
+            if desc is not None and desc == stored_desc and self.store.mode == "compact":
+                job.description = ""
+            result.unchanged.append(job)
+
+    def finish(self, boards: Optional[Iterable[str]] = None) -> DiffResult:
+        """
+        `boards` are the board_key()s fully listed this run; tracked jobs on
+        those boards that were neither added nor listed() are reported as
+        closed. Boards whose fetch failed or was incomplete must be left out,
+        or their missing jobs would look closed.
+        """
+        open_on_boards = self.store.open_ids(boards) if boards else set()
+        self.store.close()
+        self.result.closed.extend(open_on_boards - self._seen - self._listed)
+        return self.result
+
+
+def diff_jobs(
+    current_jobs: list[dict],
+    state_path: str = DEFAULT_STATE_FILE,
+    boards: Optional[Iterable[str]] = None,
+) -> DiffResult:
+    """
+    Classifies the current batch against the state store in one pass over
+    the batch, touching only the batch's ids (plus the open ids of `boards`).
+    See Differ.finish for `boards`.
+    """
+    differ = Differ(state_path)
+    differ.add(current_jobs)
+    return differ.finish(boards)
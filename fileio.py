@@ -0,0 +1,109 @@
+"""
+fileio.py
+Crash-safe JSON files for everything Job Radar writes outside the SQLite
+state store (new_jobs.json, HTTP / description caches, the Uber session).
+
+Writes stream into a temp file in the target directory, are fsynced, and
+then atomically renamed over the target — a killed process leaves either
+the old file or the new one, never a truncated mix. Output is compact
+(no indentation) unless asked otherwise, and paths ending in .gz or .zst
+are compressed (.zst needs the optional `zstandard` package).
+"""
+
+import gzip
+import io
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import IO, Optional
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+# Read once at import: the umask can only be read by setting it, which would
+# race with files created on other threads
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _compression(path: Path) -> Optional[str]:
+    if path.suffix == ".gz":
+        return "gzip"
+    if path.suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError(f"{path}: writing .zst files requires the zstandard package")
+        return "zstd"
+    return None
+
+
+def _text_writer(raw: IO[bytes], compression: Optional[str]) -> io.TextIOWrapper:
+    if compression == "gzip":
+        raw = gzip.GzipFile(fileobj=raw, mode="wb", mtime=0)
+    elif compression == "zstd":
+        raw = zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+    return io.TextIOWrapper(raw, encoding="utf-8")
+
+
+def json_default(obj):
+    """json `default=` hook: records with a to_dict() (providers.Job) are written as that dict."""
+    to_dict = getattr(obj, "to_dict", None)
+    return to_dict() if to_dict is not None else str(obj)
+
+
+def write_json(path: str, obj, indent: Optional[int] = None, mode: Optional[int] = None) -> None:
+    """
+    Streams `obj` as JSON to `path` atomically. `mode` sets the file
+    permissions (e.g. 0o600 for credentials); by default the file gets the
+    usual umask-based mode, as open() would create it.
+    """
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    compression = _compression(target)
+
+    fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as raw:
+            writer = _text_writer(raw, compression)
+            # json.dump encodes incrementally, so the document is never built as one string
+            json.dump(obj, writer, indent=indent, default=json_default)
+            stream = writer.detach()
+            if stream is not raw:
+                stream.close()  # finishes the compressed stream; raw stays open
+            raw.flush()
+            os.fsync(raw.fileno())
+        # mkstemp creates 0600 files
+        os.chmod(tmp, mode if mode is not None else 0o666 & ~_UMASK)
+        os.replace(tmp, target)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+    # Persist the rename itself
+    try:
+        dir_fd = os.open(target.parent, os.O_RDONLY)
+    except OSError:
+        return  # e.g. Windows can't open directories
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def read_json(path: str):
+    """Reads a file written by write_json, decompressing by extension."""
+    p = Path(path)
+    compression = _compression(p)
+    if compression == "gzip":
+        with gzip.open(p, "rt", encoding="utf-8") as f:
+            return json.load(f)
+    if compression == "zstd":
+        with open(p, "rb") as raw, zstandard.ZstdDecompressor().stream_reader(raw) as reader:
+            return json.load(io.TextIOWrapper(reader, encoding="utf-8"))
+    with open(p, encoding="utf-8") as f:
+        return json.load(f)
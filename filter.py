@@ -2,11 +2,25 @@
 filter.py
 Filters job postings to keep only US-based, entry-level (0-2 yrs)
 SWE / SDE / Backend / Fullstack roles. Excludes senior, staff, intern, etc.
+
+Rule tuning over a saved dump (a list of jobs, {"jobs": [...]} or a state dict):
+    python filter.py dump.json
 """
 
+import argparse
+import hashlib
 import html
+import logging
+import os
 import re
-from typing import Optional
+import time
+from collections import Counter, OrderedDict
+from typing import Callable, Optional
+
+import metrics
+from fileio import read_json, write_json
+
+logger = logging.getLogger(__name__)
 
 # ── Minimum posting date — ignore anything older than this ───────────────────
 MIN_POSTED_DATE = "2026-02-15"
@@ -98,31 +112,129 @@ _ENTRY_LEVEL_SIGNAL = re.compile(
     re.IGNORECASE,
 )
 
+# Verdicts for descriptions already seen, keyed by a hash of the raw HTML
+DESCRIPTION_CACHE_FILE = os.environ.get("JOB_RADAR_DESC_CACHE", "state/description_cache.json")
+DESCRIPTION_CACHE_SIZE = int(os.environ.get("JOB_RADAR_DESC_CACHE_SIZE", "50000"))
+
+# ── Compiled matchers — one pass per field, built from the lists above ───────
+_HTML_TAG = re.compile(r'<[^>]+>')
+_WHITESPACE = re.compile(r'\s+')
+_REMOTE = re.compile(r"\bremote\b")
+
+
+def _alternation(patterns: list[str]) -> re.Pattern:
+    """One regex matching wherever any of `patterns` would match."""
+    return re.compile("|".join(f"(?:{p})" for p in patterns))
+
+
+def _substrings(words: list[str]) -> re.Pattern:
+    """One regex equivalent to `any(w in text for w in words)`."""
+    return re.compile("|".join(re.escape(w) for w in sorted(words, key=len, reverse=True)))
+
+
+def compile_rules() -> None:
+    """
+    Builds the combined matchers used per job from the rule lists above, so
+    each field costs one regex pass instead of one per pattern. Runs at
+    import; call it again after modifying any of the lists at runtime.
+    """
+    global _TITLE_INCLUDE_RE, _TITLE_EXCLUDE_RE, _US_SIGNALS_RE, _COUNTRY_BLOCKLIST_RE
+    _TITLE_INCLUDE_RE = _alternation(TITLE_INCLUDE)
+    _TITLE_EXCLUDE_RE = _alternation(TITLE_EXCLUDE)
+    _US_SIGNALS_RE = _substrings(US_SIGNALS)
+    _COUNTRY_BLOCKLIST_RE = _substrings(COUNTRY_BLOCKLIST)
+
+
+compile_rules()
+
 
 def _strip_html(text: str) -> str:
     """Remove HTML tags and decode entities to get plain text."""
-    text = re.sub(r'<[^>]+>', ' ', text)
+    text = _HTML_TAG.sub(' ', text)
     text = html.unescape(text)
-    return re.sub(r'\s+', ' ', text).strip()
+    return _WHITESPACE.sub(' ', text).strip()
 
 
-def is_entry_level_description(description: str) -> bool:
+class DescriptionCache:
     """
-    Returns False if the description explicitly requires 3+ years of experience
-    AND contains no entry-level / new-grad override signals.
-    Returns True when no description is available (don't filter blind).
+    Size-bounded LRU of description verdicts, persisted as JSON between runs.
+    Entries are dropped when the description regexes change.
     """
-    if not description:
-        return True
+
+    def __init__(self, path: str = DESCRIPTION_CACHE_FILE, max_entries: int = DESCRIPTION_CACHE_SIZE):
+        self.path = path
+        self.max_entries = max_entries
+        self._entries: Optional[OrderedDict] = None
+        self._dirty = False
+
+    @staticmethod
+    def _rules_key() -> str:
+        rules = _SENIOR_EXP.pattern + "\0" + _ENTRY_LEVEL_SIGNAL.pattern
+        return hashlib.blake2b(rules.encode("utf-8"), digest_size=8).hexdigest()
+
+    def _load(self) -> OrderedDict:
+        if self._entries is None:
+            self._entries = OrderedDict()
+            try:
+                data = read_json(self.path)
+                if data.get("rules") == self._rules_key():
+                    self._entries.update(data.get("entries", []))
+            except (OSError, ValueError, AttributeError):
+                pass
+        return self._entries
+
+    def get(self, key: str) -> Optional[bool]:
+        entries = self._load()
+        verdict = entries.get(key)
+        if verdict is not None:
+            entries.move_to_end(key)
+        return verdict
+
+    def put(self, key: str, verdict: bool) -> None:
+        entries = self._load()
+        entries[key] = verdict
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+        self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty or not self.path:
+            return
+        write_json(self.path, {"rules": self._rules_key(), "entries": list(self._entries.items())})
+        self._dirty = False
+        logger.info(f"Description cache saved: {len(self._entries)} entries in {self.path}")
+
+
+_DESCRIPTION_CACHE = DescriptionCache()
+
+
+def save_description_cache() -> None:
+    _DESCRIPTION_CACHE.save()
+
+
+def _classify_description(description: str) -> bool:
     text = _strip_html(description)
     if _SENIOR_EXP.search(text) and not _ENTRY_LEVEL_SIGNAL.search(text):
         return False
     return True
 
 
-def _match_any(text: str, patterns: list[str]) -> bool:
-    t = text.lower()
-    return any(re.search(p, t) for p in patterns)
+def is_entry_level_description(description: str) -> bool:
+    """
+    Returns False if the description explicitly requires 3+ years of experience
+    AND contains no entry-level / new-grad override signals.
+    Returns True when no description is available (don't filter blind).
+    Verdicts are memoized by content hash, so unchanged postings skip stripping.
+    """
+    if not description:
+        return True
+    key = hashlib.blake2b(description.encode("utf-8"), digest_size=16).hexdigest()
+    verdict = _DESCRIPTION_CACHE.get(key)
+    if verdict is None:
+        verdict = _classify_description(description)
+        _DESCRIPTION_CACHE.put(key, verdict)
+    return verdict
 
 
 def is_us_location(location: Optional[str]) -> bool:
@@ -132,13 +244,13 @@ def is_us_location(location: Optional[str]) -> bool:
     if loc in PLACEHOLDER_LOCATIONS:
         return True  # placeholder = no real location set, treat as remote
     # Country blocklist first — catches "Remote in Canada", "UK Remote", etc.
-    if any(c in loc for c in COUNTRY_BLOCKLIST):
+    if _COUNTRY_BLOCKLIST_RE.search(loc):
         return False
     # Then allowlist: include if explicit US city/signal found
-    if any(sig in loc for sig in US_SIGNALS):
+    if _US_SIGNALS_RE.search(loc):
         return True
     # "remote" alone (no country qualifier) counts as US-eligible
-    if re.search(r"\bremote\b", loc):
+    if _REMOTE.search(loc):
         return True
     return False
 
@@ -146,11 +258,12 @@ def is_us_location(location: Optional[str]) -> bool:
 def is_relevant_title(title: str) -> bool:
     if not title:
         return False
+    t = title.lower()
     # Hard excludes first
-    if _match_any(title, TITLE_EXCLUDE):
+    if _TITLE_EXCLUDE_RE.search(t):
         return False
     # Must match a core SWE title
-    if not _match_any(title, TITLE_INCLUDE):
+    if not _TITLE_INCLUDE_RE.search(t):
         return False
     return True
 
@@ -172,3 +285,72 @@ def passes_filter(job: dict) -> bool:
         and is_recent_enough(job.get("posted_at"))
         and is_entry_level_description(job.get("description", ""))
     )
+
+
+# ── Batch API ────────────────────────────────────────────────────────────────
+# (rule name, job field, predicate) — evaluated in order, like passes_filter
+BATCH_RULES: list[tuple[str, str, Callable]] = [
+    ("title", "title", is_relevant_title),
+    ("location", "location", is_us_location),
+    ("posted_at", "posted_at", is_recent_enough),
+    ("description", "description", is_entry_level_description),
+]
+
+
+def filter_batch(jobs: list[dict]) -> tuple[list[bool], list[Optional[str]]]:
+    """
+    Evaluates BATCH_RULES over a batch of jobs column by column.
+
+    Each rule runs once per distinct value in its column (titles and
+    locations repeat heavily across a scan) and only over rows that passed
+    the earlier rules.
+
+    Returns:
+        mask     — True where the job passes every rule (same as passes_filter)
+        reasons  — name of the first rule that rejected each job, else None
+    """
+    mask = [True] * len(jobs)
+    reasons: list[Optional[str]] = [None] * len(jobs)
+    alive = range(len(jobs))
+
+    for rule, field, predicate in BATCH_RULES:
+        started = time.perf_counter()
+        column = [jobs[i].get(field) for i in alive]
+        verdicts: dict = {}
+        survivors = []
+        for i, value in zip(alive, column):
+            ok = verdicts.get(value)
+            if ok is None:
+                ok = verdicts[value] = predicate(value)
+            if ok:
+                survivors.append(i)
+            else:
+                mask[i] = False
+                reasons[i] = rule
+        metrics.record_rule(rule, time.perf_counter() - started, len(column), len(verdicts), len(column) - len(survivors))
+        alive = survivors
+
+    return mask, reasons
+
+
+def _load_dump(path: str) -> list[dict]:
+    data = read_json(path)
+    if isinstance(data, dict):
+        data = data.get("jobs", list(data.values()))
+    return [j for j in data if isinstance(j, dict)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the job filter over a saved job dump")
+    parser.add_argument("path", help="JSON list of jobs, {'jobs': [...]} or a jobs_seen-style dict")
+    args = parser.parse_args()
+
+    jobs = _load_dump(args.path)
+    mask, reasons = filter_batch(jobs)
+    print(f"{len(jobs)} jobs, {sum(mask)} pass")
+    for rule, count in Counter(r for r in reasons if r).most_common():
+        print(f"  rejected by {rule:<12} {count}")
+
+
+if __name__ == "__main__":
+    main()
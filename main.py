@@ -4,21 +4,38 @@ Job Radar - Stage 1
 Fetches new grad SWE jobs from ATS providers, filters them, diffs against
 last run, and saves new jobs to jobs.json.
 
+Jobs stream through the stages company by company as fetches complete
+(fetch → filter → dedupe → diff), so rejected postings and their
+descriptions are freed as soon as the filter has seen them; only jobs that
+pass the filter are held until the run's results are saved.
+
 Usage:
     python main.py                        # full run
     python main.py --dry-run             # run without saving state or notifying
     python main.py --company "Stripe"    # test a single company
     python main.py --provider greenhouse # test all greenhouse companies
+    python main.py --company "Nvidia" --list-facets  # show Workday facet IDs
+    python main.py --compact-state       # apply retention and shrink the state store
+    python main.py --daemon              # scan every 15 min until stopped
+    python main.py --company "Uber" --import-times  # report provider import cost
+    python main.py --dry-run --profile --trace-memory  # cProfile + tracemalloc
 """
 
 import argparse
-import concurrent.futures
-import json
+import asyncio
+import cProfile
 import logging
 import os
+import pstats
+import random
+import signal
 import sys
-from datetime import datetime, timezone
-from pathlib import Path
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, NamedTuple, Optional
 
 # Ensure stdout handles Unicode (emojis) on Windows terminals
 if hasattr(sys.stdout, "reconfigure"):
@@ -26,11 +43,16 @@ if hasattr(sys.stdout, "reconfigure"):
 
 import yaml
 
-from providers import get_provider
-from providers.adzuna import fetch_jobs as adzuna_fetch
-from filter import passes_filter
-from diff import find_new_jobs, save_state
+import metrics
+from providers import IMPORT_TIMES, INCREMENTAL, PREFILTERED, Job, PartialFetch, get_async_provider
+from providers import transport
+from providers.adzuna import fetch_jobs_async as adzuna_fetch
+from fileio import write_json
+from filter import filter_batch, save_description_cache
+from dedupe import Deduper, save_fingerprints
+from diff import DiffResult, Differ, StateStore, board_key, checkpoint, company_key, hold_in_memory, save_state
 from notify import notify
+from scheduler import due_companies, record_scans
 
 logging.basicConfig(
     level=logging.INFO,
@@ -40,22 +62,48 @@ logging.basicConfig(
 logger = logging.getLogger("job_radar")
 
 COMPANIES_FILE = os.environ.get("COMPANIES_FILE", "companies.yaml")
-STATE_FILE = os.environ.get("JOB_RADAR_STATE", "state/jobs_seen.json")
+STATE_FILE = os.environ.get("JOB_RADAR_STATE", "state/jobs_seen.db")
 NEW_JOBS_FILE = os.environ.get("JOB_RADAR_OUTPUT", "state/new_jobs.json")
-MAX_WORKERS = int(os.environ.get("JOB_RADAR_WORKERS", "10"))
+REPORT_FILE = os.environ.get(
+    "JOB_RADAR_REPORT", os.path.join(os.path.dirname(NEW_JOBS_FILE), "run_report.json"),
+)
+PROFILE_FILE = os.path.join(os.path.dirname(REPORT_FILE), "run.prof")
+# Incremental fetches stop at each company's watermark; a full scan (which
+# also detects closed postings) runs once this many hours have passed. 0 = always full.
+FULL_SCAN_HOURS = float(os.environ.get("JOB_RADAR_FULL_SCAN_HOURS", "24"))
+
+# Daemon mode: minutes between scans, ± jitter as a fraction of the interval,
+# and how often the in-memory state is written back to disk
+DAEMON_INTERVAL_MINUTES = float(os.environ.get("JOB_RADAR_INTERVAL_MINUTES", "15"))
+DAEMON_JITTER = float(os.environ.get("JOB_RADAR_JITTER", "0.2"))
+CHECKPOINT_MINUTES = float(os.environ.get("JOB_RADAR_CHECKPOINT_MINUTES", "30"))
+
+# Pseudo company config for the Adzuna aggregator, so it gets a watermark too
+ADZUNA = {"name": "Adzuna", "provider": "adzuna"}
+
+# path → (mtime, companies); the daemon only re-parses the YAML when it changes
+_companies_cache: dict[str, tuple[int, list[dict]]] = {}
 
 
 def load_companies(path: str = COMPANIES_FILE) -> list[dict]:
+    mtime = os.stat(path).st_mtime_ns
+    cached = _companies_cache.get(path)
+    if cached and cached[0] == mtime:
+        return list(cached[1])
     with open(path) as f:
         data = yaml.safe_load(f)
-    return data.get("companies", [])
+    companies = data.get("companies", [])
+    _companies_cache[path] = (mtime, companies)
+    return list(companies)
 
 
-def fetch_company(company_cfg: dict) -> list[dict]:
+async def fetch_company(company_cfg: dict) -> list[Job]:
     provider_name = company_cfg.get("provider")
     try:
-        fetch_fn = get_provider(provider_name)
-        return fetch_fn(company_cfg)
+        fetch_fn = get_async_provider(provider_name)
+        return await fetch_fn(company_cfg)
+    except PartialFetch:
+        raise  # iter_fetches keeps the jobs but not the board
     except ValueError as e:
         logger.warning(str(e))
         return []
@@ -64,18 +112,210 @@ def fetch_company(company_cfg: dict) -> list[dict]:
         return []
 
 
-def save_new_jobs(jobs: list[dict], path: str = NEW_JOBS_FILE) -> None:
-    Path(path).parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w") as f:
-        json.dump({
-            "generated_at": datetime.now(timezone.utc).isoformat(),
-            "count": len(jobs),
-            "jobs": jobs,
-        }, f, indent=2, default=str)
+async def iter_fetches(
+    companies: list[dict],
+    adzuna_cfg: Optional[dict] = None,
+) -> AsyncIterator[tuple[dict, list[Job], bool]]:
+    """
+    Fetches every company (and Adzuna, if `adzuna_cfg` is given) concurrently
+    on one event loop, yielding (company_cfg, jobs, complete) as they
+    complete; `complete` is False when the provider lost part of the board.
+    Request concurrency is bounded globally and per host by
+    providers/transport.py.
+    """
+    async def timed(cfg: dict, fetch) -> tuple[dict, list[Job], bool]:
+        # Each task runs in its own context, so this only tags this company's requests
+        name = cfg.get("name", "")
+        metrics.company.set(name)
+        started = time.perf_counter()
+        try:
+            jobs, complete = await fetch, True
+        except PartialFetch as e:
+            logger.warning(f"{name}: incomplete fetch ({e}) — keeping {len(e.jobs)} jobs, skipping closed detection")
+            jobs, complete = e.jobs, False
+        metrics.record_fetch(name, time.perf_counter() - started, len(jobs))
+        return cfg, jobs, complete
+
+    tasks = [asyncio.create_task(timed(c, fetch_company(c))) for c in companies]
+    if adzuna_cfg is not None:
+        tasks.append(asyncio.create_task(timed(adzuna_cfg, adzuna_fetch(since=adzuna_cfg.get("since")))))
+
+    for task in asyncio.as_completed(tasks):
+        try:
+            yield await task
+        except Exception as e:
+            logger.error(f"Unhandled error: {e}")
+
+
+class Scan(NamedTuple):
+    result: DiffResult
+    fetched: int
+    passed: int                  # jobs that passed the filter
+    duplicates: int
+    reasons: Counter             # filter rule → jobs it rejected
+    watermarks: list[tuple[str, Optional[str], bool]]
+    scanned: list[str]           # company_key()s whose fetch completed with jobs (Adzuna excluded)
+    owners: dict[str, str]       # job_id → company_key() for jobs that passed the filter
+
+
+async def scan(companies: list[dict], adzuna_cfg: Optional[dict] = None) -> Scan:
+    """
+    Runs each company's jobs through filter → dedupe → diff as soon as its
+    fetch completes, while the other fetches are still in flight. Aggregator
+    results are held back until every ATS board is in, so dedupe always
+    prefers the ATS copy of a posting.
+    """
+    reasons: Counter = Counter()
+    fetched = passed = 0
+    boards: set[str] = set()
+    marks: list[tuple[str, Optional[str], bool]] = []
+    scanned: list[str] = []
+    owners: dict[str, str] = {}
+    held: list[Job] = []
+
+    deduper = Deduper(STATE_FILE)
+    differ = Differ(STATE_FILE)
+    async for cfg, jobs, complete in iter_fetches(companies, adzuna_cfg):
+        key = company_key(cfg)
+        fetched += len(jobs)
+        # A failed or partial fetch says nothing about the board: no watermark
+        # (it could skip the lost pages), no schedule update, no closed jobs
+        if jobs and complete:
+            marks.append((key, newest_posted(jobs), not cfg.get("since")))
+            if cfg is not adzuna_cfg:
+                scanned.append(key)
+                # Only full listings can tell which tracked jobs have closed
+                if not cfg.get("since") and cfg.get("provider") not in PREFILTERED:
+                    boards.update(board_key(j) for j in jobs if j.provider not in ("", "adzuna"))
+                    differ.listed(j.job_id for j in jobs)
+
+        with metrics.stage("filter"):
+            mask, why = filter_batch(jobs)
+            # Rejected postings (and their descriptions) are released here
+            jobs = [j for j, keep in zip(jobs, mask) if keep]
+        reasons.update(r for r in why if r)
+        passed += len(jobs)
+        owners.update((j.job_id, key) for j in jobs)
+
+        if cfg is adzuna_cfg:
+            held = jobs
+            continue
+        with metrics.stage("dedupe"):
+            jobs = deduper.add(jobs)
+        with metrics.stage("diff"):
+            differ.add(jobs)
+
+    with metrics.stage("dedupe"):
+        held = deduper.add(held)
+        deduper.close()
+    with metrics.stage("diff"):
+        differ.add(held)
+        result = differ.finish(boards)
+    return Scan(result, fetched, passed, len(deduper.duplicates), reasons, marks, scanned, owners)
+
+
+# ── Watermarks ──────────────────────────────────────────────────────────────
+
+def newest_posted(jobs: list[Job]) -> Optional[str]:
+    """Newest posted_at among `jobs` as an ISO date, or None if none is known."""
+    dates = [str(j.posted_at)[:10] for j in jobs if j.posted_at]
+    return max((d for d in dates if len(d) == 10 and d[4] == "-"), default=None)
+
+
+def fetches_incrementally(cfg: dict) -> bool:
+    """Whether the provider honours `since` for this config; others would fetch everything anyway."""
+    if cfg is ADZUNA:
+        return True
+    if cfg.get("provider") == "workday_url" and cfg.get("search_text"):
+        return False  # searches always page through every result
+    return cfg.get("provider") in INCREMENTAL
+
+
+def with_watermarks(companies: list[dict], path: str = STATE_FILE) -> list[dict]:
+    """
+    Returns `companies` with `since` set for those whose provider can fetch
+    incrementally and whose last full scan is within FULL_SCAN_HOURS.
+    """
+    if FULL_SCAN_HOURS <= 0:
+        return companies
+    eligible = [c for c in companies if fetches_incrementally(c)]
+    with StateStore(path) as store:
+        marks = store.watermarks(company_key(c) for c in eligible)
+
+    cutoff = (datetime.now(timezone.utc) - timedelta(hours=FULL_SCAN_HOURS)).isoformat(timespec="seconds")
+    planned = []
+    for cfg in companies:
+        watermark, full_scan_at = marks.get(company_key(cfg), (None, None))
+        if watermark and full_scan_at and full_scan_at >= cutoff:
+            cfg = {**cfg, "since": watermark}
+        planned.append(cfg)
+    incremental = sum(1 for c in planned if c.get("since"))
+    if incremental:
+        logger.info(f"Incremental fetch for {incremental} companies (full scan every {FULL_SCAN_HOURS:g}h)")
+    return planned
+
+
+def save_watermarks(rows: list[tuple[str, Optional[str], bool]], path: str = STATE_FILE) -> None:
+    with StateStore(path) as store:
+        store.save_watermarks(rows)
+
+
+def save_new_jobs(
+    jobs: list[Job],
+    path: str = NEW_JOBS_FILE,
+    changed: list[Job] = (),
+    closed: list[str] = (),
+) -> None:
+    write_json(path, {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "count": len(jobs),
+        "jobs": jobs,
+        "changed": list(changed),
+        "closed": list(closed),
+    })
     logger.info(f"New jobs saved to {path}")
 
 
+def print_workday_facets(filter_company: str) -> None:
+    from providers.workday import list_facets
+
+    companies = [
+        c for c in load_companies()
+        if c.get("name", "").lower() == filter_company.lower() and c.get("provider") == "workday_url"
+    ]
+    if not companies:
+        logger.error(f"Workday company '{filter_company}' not found in companies.yaml")
+        sys.exit(1)
+    for row in list_facets(companies[0]):
+        print(f"  {row['facet']:<28} {row['id']:<36} {row['label']} ({row['count']})")
+
+
+def print_import_times() -> None:
+    for name, seconds in sorted(IMPORT_TIMES.items(), key=lambda kv: -kv[1]):
+        print(f"  {name:<18} {seconds * 1000:8.1f} ms")
+
+
+def compact_state(path: str = STATE_FILE) -> None:
+    with StateStore(path) as store:
+        removed, before, after = store.compact()
+        remaining = store.count()
+    logger.info(
+        f"Compacted {path}: removed {removed} jobs, {remaining} remain, "
+        f"{before / 1024:.1f} KiB → {after / 1024:.1f} KiB (reclaimed {(before - after) / 1024:.1f} KiB)"
+    )
+
+
+def write_run_report(report: dict, path: str = REPORT_FILE) -> None:
+    write_json(path, report, indent=2)
+    slowest = list(report["companies"].items())[:3]
+    logger.info(
+        f"Run report saved to {path} ({report['duration_s']:.1f}s; slowest: "
+        + ", ".join(f"{name} {stats['fetch_s']:.1f}s" for name, stats in slowest) + ")"
+    )
+
+
 def run(dry_run: bool = False, filter_company: str = None, filter_provider: str = None):
+    metrics.reset()
     companies = load_companies()
 
     if filter_company:
@@ -90,55 +330,125 @@ def run(dry_run: bool = False, filter_company: str = None, filter_provider: str
             logger.error(f"No companies with provider '{filter_provider}' found")
             sys.exit(1)
 
-    logger.info(f"Scanning {len(companies)} companies...")
+    # Targeted runs scan everything they name; full runs only companies that are due
+    full_run = not filter_company and not filter_provider
+    skipped: list[dict] = []
+    if full_run:
+        companies, skipped = due_companies(companies, state_path=STATE_FILE)
 
-    all_jobs: list[dict] = []
-    with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = {executor.submit(fetch_company, c): c for c in companies}
-        for future in concurrent.futures.as_completed(futures):
-            try:
-                jobs = future.result()
-                all_jobs.extend(jobs)
-            except Exception as e:
-                company = futures[future]
-                logger.error(f"Unhandled error for {company.get('name')}: {e}")
+    logger.info(f"Scanning {len(companies)} companies...")
 
     # Adzuna aggregator (runs unless filtering by a specific company)
-    if not filter_company and not filter_provider:
-        adzuna_jobs = adzuna_fetch()
-        all_jobs.extend(adzuna_jobs)
+    include_adzuna = full_run
+    planned = with_watermarks(companies + ([ADZUNA] if include_adzuna else []))
+    adzuna_cfg = planned.pop() if include_adzuna else None
+    # "scan" is wall-clock for the whole chain; filter/dedupe/diff overlap the fetches
+    with metrics.stage("scan"):
+        found = asyncio.run(scan(planned, adzuna_cfg=adzuna_cfg))
+    result = found.result
+    new_jobs = result.new
 
-    logger.info(f"Total fetched (pre-filter): {len(all_jobs)}")
-
-    filtered = [j for j in all_jobs if passes_filter(j)]
-    logger.info(f"After filter: {len(filtered)}")
-
-    new_jobs, new_state = find_new_jobs(filtered, state_path=STATE_FILE)
-    logger.info(f"New (not seen before): {len(new_jobs)}")
+    logger.info(f"Total fetched (pre-filter): {found.fetched}")
+    logger.info(f"After filter: {found.passed}")
+    for rule, count in found.reasons.most_common():
+        logger.info(f"  rejected by {rule}: {count}")
+    if found.duplicates:
+        logger.info(f"Collapsed {found.duplicates} cross-provider duplicate(s)")
+    with metrics.stage("save_description_cache"):
+        save_description_cache()
+        transport.CACHE.prune()
+    logger.info(
+        f"New: {len(result.new)}  changed: {len(result.changed)}  "
+        f"unchanged: {len(result.unchanged)}  closed: {len(result.closed)}"
+    )
 
     if new_jobs:
         print(f"\n{'='*60}")
         print(f"  {len(new_jobs)} NEW JOB(S) FOUND")
         print(f"{'='*60}\n")
         for job in new_jobs:
-            print(f"  {job['company']} — {job['title']}")
-            print(f"  📍 {job.get('location') or 'N/A'}")
-            print(f"  🔗 {job.get('apply_url') or 'N/A'}")
-            posted = str(job.get('posted_at') or '')[:10]
+            print(f"  {job.company} — {job.title}")
+            print(f"  📍 {job.location or 'N/A'}")
+            print(f"  🔗 {job.apply_url or 'N/A'}")
+            posted = str(job.posted_at or '')[:10]
             if posted:
                 print(f"  📅 {posted}")
             print()
-
-        if not dry_run:
-            save_new_jobs(new_jobs)
-            save_state(new_state, path=STATE_FILE)
-            notify(new_jobs)
-        else:
-            logger.info("[DRY RUN] State not saved, no notification sent.")
     else:
         logger.info("No new jobs found.")
-        if not dry_run:
-            save_state(new_state, path=STATE_FILE)
+
+    if dry_run:
+        logger.info("[DRY RUN] State not saved, no notification sent.")
+    else:
+        with metrics.stage("save"):
+            if new_jobs or result.changed or result.closed:
+                save_new_jobs(new_jobs, changed=result.changed, closed=result.closed)
+            save_state(result, path=STATE_FILE)
+            save_fingerprints(result.new + result.changed + result.unchanged, state_path=STATE_FILE)
+            save_watermarks(found.watermarks)
+            active = {found.owners.get(j.job_id) for j in result.new + result.changed}
+            record_scans(found.scanned, active, skipped, state_path=STATE_FILE)
+        with metrics.stage("notify"):
+            notify(new_jobs, changed=result.changed)
+
+    write_run_report(metrics.report(
+        generated_at=datetime.now(timezone.utc).isoformat(),
+        dry_run=dry_run,
+        companies_scanned=len(companies),
+        companies_skipped=len(skipped),
+        jobs_fetched=found.fetched,
+        jobs_after_filter=found.passed,
+        duplicates=found.duplicates,
+        new=len(result.new),
+        changed=len(result.changed),
+        unchanged=len(result.unchanged),
+        closed=len(result.closed),
+    ))
+
+
+def daemon(interval_minutes: float = DAEMON_INTERVAL_MINUTES, dry_run: bool = False) -> None:
+    """
+    Scans every `interval_minutes` (± DAEMON_JITTER) until SIGINT/SIGTERM.
+    The state database, HTTP connection pool, compiled filters and imported
+    providers stay in memory between scans; state is checkpointed to disk
+    every CHECKPOINT_MINUTES and on exit. A signal lets the current scan finish.
+    """
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+
+    state_path = hold_in_memory(STATE_FILE)
+    last_checkpoint = time.monotonic()
+    try:
+        while not stop.is_set():
+            started = time.monotonic()
+            try:
+                run(dry_run=dry_run)
+            except Exception:
+                logger.exception("Scan failed")
+            if time.monotonic() - last_checkpoint >= CHECKPOINT_MINUTES * 60:
+                checkpoint(state_path)
+                last_checkpoint = time.monotonic()
+
+            jitter = random.uniform(-DAEMON_JITTER, DAEMON_JITTER)
+            delay = max(0.0, interval_minutes * 60 * (1 + jitter) - (time.monotonic() - started))
+            logger.info(f"Next scan in {delay / 60:.1f} min")
+            stop.wait(delay)
+    finally:
+        checkpoint(state_path)
+        logger.info("Daemon stopped")
+
+
+def profiled(fn, *args, **kwargs) -> None:
+    """Runs fn under cProfile, saves the stats to PROFILE_FILE and prints the top entries."""
+    profiler = cProfile.Profile()
+    try:
+        profiler.runcall(fn, *args, **kwargs)
+    finally:
+        os.makedirs(os.path.dirname(PROFILE_FILE) or ".", exist_ok=True)
+        profiler.dump_stats(PROFILE_FILE)
+        logger.info(f"Profile saved to {PROFILE_FILE} (inspect with: python -m pstats {PROFILE_FILE})")
+        pstats.Stats(profiler, stream=sys.stdout).sort_stats("cumulative").print_stats(25)
 
 
 def main():
@@ -146,8 +456,38 @@ def main():
     parser.add_argument("--dry-run", action="store_true", help="Run without saving state or notifying")
     parser.add_argument("--company", type=str, default=None, help="Test a single company by name")
     parser.add_argument("--provider", type=str, default=None, help="Test all companies for a specific provider")
+    parser.add_argument("--list-facets", action="store_true", help="List Workday facet IDs for --company")
+    parser.add_argument("--compact-state", action="store_true", help="Apply retention and rewrite the state store")
+    parser.add_argument("--daemon", action="store_true", help="Keep running, scanning on an interval")
+    parser.add_argument("--interval", type=float, default=DAEMON_INTERVAL_MINUTES,
+                        help="Minutes between daemon scans (default: %(default)s)")
+    parser.add_argument("--import-times", action="store_true", help="Report provider module import times")
+    parser.add_argument("--profile", action="store_true", help="Run under cProfile and save the stats")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Trace allocations with tracemalloc and add them to the run report")
     args = parser.parse_args()
-    run(dry_run=args.dry_run, filter_company=args.company, filter_provider=args.provider)
+    if args.compact_state:
+        compact_state()
+        return
+    if args.list_facets:
+        if not args.company:
+            parser.error("--list-facets requires --company")
+        print_workday_facets(args.company)
+        return
+    if args.trace_memory:
+        tracemalloc.start()
+    if args.daemon:
+        if args.company or args.provider:
+            parser.error("--daemon scans all companies; drop --company/--provider")
+        daemon(args.interval, dry_run=args.dry_run)
+        return
+    kwargs = dict(dry_run=args.dry_run, filter_company=args.company, filter_provider=args.provider)
+    if args.profile:
+        profiled(run, **kwargs)
+    else:
+        run(**kwargs)
+    if args.import_times:
+        print_import_times()
 
 
 if __name__ == "__main__":
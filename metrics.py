@@ -0,0 +1,126 @@
+"""
+metrics.py
+Per-run instrumentation for a scan.
+
+Providers don't pass anything around: main.py sets the `company` context
+variable inside each company's fetch task, and providers/transport.py
+attributes every request (bytes downloaded, time on the wire, 304s) and
+every JSON parse to whichever company is current. Stage timers cover the
+rest of the pipeline (filter rules, dedupe, diff, save) and accumulate
+across calls, since filter/dedupe/diff run once per company as fetches land.
+
+report() returns the run as a JSON-serializable dict; main.py writes it to
+state/run_report.json. If tracemalloc is tracing, the report also carries
+peak memory and the top allocation sites.
+"""
+
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+company: ContextVar[str] = ContextVar("company", default="-")
+
+_COUNTERS = ("requests", "browser_requests", "not_modified", "bytes", "request_s", "parse_s", "fetch_s", "jobs")
+
+_lock = threading.Lock()
+_companies: dict[str, dict] = {}
+_stages: dict[str, float] = {}
+_rules: dict[str, dict] = {}
+_started = time.perf_counter()
+
+
+def reset() -> None:
+    """Starts a new run (the daemon scans many times per process)."""
+    global _started
+    with _lock:
+        _companies.clear()
+        _stages.clear()
+        _rules.clear()
+        _started = time.perf_counter()
+
+
+def _stats(name: str) -> dict:
+    stats = _companies.get(name)
+    if stats is None:
+        stats = _companies[name] = dict.fromkeys(_COUNTERS, 0)
+    return stats
+
+
+def record_request(nbytes: int, seconds: float, not_modified: bool = False, browser: bool = False) -> None:
+    with _lock:
+        stats = _stats(company.get())
+        stats["browser_requests" if browser else "requests"] += 1
+        stats["not_modified"] += not_modified
+        stats["bytes"] += nbytes
+        stats["request_s"] += seconds
+
+
+def record_parse(seconds: float) -> None:
+    with _lock:
+        _stats(company.get())["parse_s"] += seconds
+
+
+def record_fetch(name: str, seconds: float, jobs: int) -> None:
+    """Wall-clock latency of a company's whole fetch, including waits for a connection slot."""
+    with _lock:
+        stats = _stats(name)
+        stats["fetch_s"] += seconds
+        stats["jobs"] += jobs
+
+
+def record_rule(rule: str, seconds: float, evaluated: int, distinct: int, rejected: int) -> None:
+    """Accumulates across filter_batch() calls (one per company in a streaming scan)."""
+    with _lock:
+        stats = _rules.get(rule)
+        if stats is None:
+            stats = _rules[rule] = {"seconds": 0.0, "evaluated": 0, "distinct": 0, "rejected": 0}
+        stats["seconds"] += seconds
+        stats["evaluated"] += evaluated
+        stats["distinct"] += distinct
+        stats["rejected"] += rejected
+
+
+@contextmanager
+def stage(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        with _lock:
+            _stages[name] = _stages.get(name, 0.0) + elapsed
+
+
+def _memory(top: int = 10) -> dict:
+    current, peak = tracemalloc.get_traced_memory()
+    sites = tracemalloc.take_snapshot().statistics("lineno")[:top]
+    return {
+        "current_bytes": current,
+        "peak_bytes": peak,
+        "top_allocations": [
+            {"site": str(stat.traceback), "bytes": stat.size, "blocks": stat.count} for stat in sites
+        ],
+    }
+
+
+def report(**summary) -> dict:
+    """Snapshot of the run so far; `summary` (counts etc.) is merged in at the top level."""
+    with _lock:
+        companies = sorted(_companies.items(), key=lambda kv: -kv[1]["fetch_s"])
+        data = {
+            **summary,
+            "duration_s": round(time.perf_counter() - _started, 3),
+            "stages": {name: round(s, 4) for name, s in _stages.items()},
+            "filter_rules": {
+                rule: {**r, "seconds": round(r["seconds"], 4)} for rule, r in _rules.items()
+            },
+            "companies": {
+                name: {k: round(v, 4) if isinstance(v, float) else v for k, v in stats.items()}
+                for name, stats in companies
+            },
+        }
+    if tracemalloc.is_tracing():
+        data["memory"] = _memory()
+    return data
@@ -31,9 +31,10 @@ def _format_job(job: dict) -> str:
     return line
 
 
-def _build_messages(jobs: list[dict]) -> list[str]:
+def _build_messages(jobs: list[dict], headline: str = "") -> list[str]:
+    headline = headline or f"🚨 **{len(jobs)} new grad SWE role(s) detected!**"
     header = (
-        f"🚨 **{len(jobs)} new grad SWE role(s) detected!**\n"
+        f"{headline}\n"
         f"_{datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')}_\n\n"
     )
     messages = []
@@ -50,12 +51,12 @@ def _build_messages(jobs: list[dict]) -> list[str]:
     return messages
 
 
-def send_discord(jobs: list[dict], webhook_url: str = "") -> None:
+def send_discord(jobs: list[dict], webhook_url: str = "", headline: str = "") -> None:
     url = webhook_url or DISCORD_WEBHOOK_URL
     if not url:
         logger.warning("DISCORD_WEBHOOK_URL not set — skipping Discord notification.")
         return
-    for message in _build_messages(jobs):
+    for message in _build_messages(jobs, headline):
         payload = json.dumps({"content": message}).encode("utf-8")
         req = urllib.request.Request(
             url,
@@ -73,7 +74,9 @@ def send_discord(jobs: list[dict], webhook_url: str = "") -> None:
             logger.error(f"Discord send failed: {e}")
 
 
-def notify(jobs: list[dict]) -> None:
-    if not jobs:
-        return
-    send_discord(jobs)
+def notify(jobs: list[dict], changed: list[dict] = ()) -> None:
+    """Alerts on new jobs, plus a separate message for materially edited ones."""
+    if jobs:
+        send_discord(jobs)
+    if changed:
+        send_discord(list(changed), headline=f"✏️ **{len(changed)} tracked role(s) updated**")
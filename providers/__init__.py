@@ -1,9 +1,13 @@
 """
 providers/__init__.py
-Registry mapping provider name → fetch function.
-Each fetch(company_cfg) returns list[dict] of normalized job dicts.
+Registry mapping provider name → provider module, imported on first use so
+a run only pays for the providers it scans (Playwright in particular).
+get_provider(name) returns the module's fetch(company_cfg), which returns
+list[Job] of normalized postings; get_async_provider(name) returns its
+`async fetch_async(company_cfg)` coroutine, which shares the keep-alive pool
+in providers/transport.py. IMPORT_TIMES records how long each import took.
 
-Normalized schema:
+Normalized schema (Job):
     job_id      str   — unique ID (provider-prefixed)
     company     str   — company name
     title       str   — job title
@@ -11,27 +15,159 @@ Normalized schema:
     posted_at   str   — ISO date or None
     apply_url   str   — direct apply link
     provider    str   — which ATS provider
+    description str   — HTML or plain text, "" when the board has none
+
+Providers in INCREMENTAL accept `since` (an ISO date) in company_cfg and may
+then stop paging once they reach postings older than it, returning only
+part of the board.
+
+A provider that lost part of a board to a transient error (a failed page)
+raises PartialFetch carrying the jobs it did get, so the caller can still
+report them without treating the board as fully listed. Providers in
+PREFILTERED return only postings that pass their own filters, so their
+results never list a whole board either.
 """
 
-from providers.greenhouse import fetch as greenhouse_fetch
-from providers.lever import fetch as lever_fetch
-from providers.ashby import fetch as ashby_fetch
-from providers.smartrecruiters import fetch as smartrecruiters_fetch
-from providers.workday import fetch as workday_fetch
-from providers.uber import fetch as uber_fetch
-
-REGISTRY: dict = {
-    "greenhouse": greenhouse_fetch,
-    "lever": lever_fetch,
-    "ashby": ashby_fetch,
-    "smartrecruiters": smartrecruiters_fetch,
-    "workday_url": workday_fetch,
-    "uber": uber_fetch,
+import importlib
+import logging
+import os
+import sys
+import time
+import zlib
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Provider name → module; a module is imported the first time a company using it is fetched
+PROVIDER_MODULES: dict[str, str] = {
+    "greenhouse": "providers.greenhouse",
+    "lever": "providers.lever",
+    "ashby": "providers.ashby",
+    "smartrecruiters": "providers.smartrecruiters",
+    "workday_url": "providers.workday",
+    "uber": "providers.uber",
 }
 
+# Provider name → seconds spent importing its module in this process
+IMPORT_TIMES: dict[str, float] = {}
+
+INCREMENTAL = {"smartrecruiters", "workday_url"}
+PREFILTERED = {"uber"}
+
+# Descriptions at least this long are held zlib-compressed; 0 = never compress
+COMPRESS_MIN_CHARS = int(os.environ.get("JOB_RADAR_COMPRESS_MIN_CHARS", "1024"))
+
+
+class PartialFetch(Exception):
+    """Raised with the jobs that were fetched when part of a board could not be."""
+
+    def __init__(self, jobs: list, reason: str):
+        super().__init__(reason)
+        self.jobs = jobs
+
+
+# ── Job record ───────────────────────────────────────────────────────────────
+
+class Job:
+    """
+    One normalized posting. Slots instead of a per-posting dict; `company`
+    and `provider` are interned, so a board's postings share one string
+    each; the description, usually most of a posting's size, is kept
+    compressed and only decompressed when read.
+
+    job["field"] and job.get("field") work as on the old dicts, so helpers
+    that also take plain dicts (legacy state rows, JSON dumps) accept either.
+
+    `incomplete` is set by a provider whose usual detail source for the
+    posting failed: its fields are provisional (a list-payload location, a
+    description from a fallback source), so the diff neither compares nor
+    stores their hashes this run.
+    """
+
+    FIELDS = ("job_id", "company", "title", "location", "posted_at", "apply_url", "provider", "description")
+    __slots__ = (
+        "job_id", "company", "title", "location", "posted_at", "apply_url", "provider", "_description", "incomplete",
+    )
+
+    def __init__(
+        self,
+        job_id: str,
+        company: str,
+        title: str,
+        location: str = "",
+        posted_at: Optional[str] = None,
+        apply_url: str = "",
+        provider: str = "",
+        description: Optional[str] = "",
+    ):
+        self.job_id = job_id
+        self.company = sys.intern(company or "")
+        self.title = title
+        self.location = location
+        self.posted_at = posted_at
+        self.apply_url = apply_url
+        self.provider = sys.intern(provider or "")
+        self.description = description
+        self.incomplete = False
+
+    @property
+    def description(self) -> str:
+        data = self._description
+        return zlib.decompress(data).decode("utf-8") if isinstance(data, bytes) else data
+
+    @description.setter
+    def description(self, text: Optional[str]) -> None:
+        text = text or ""
+        if COMPRESS_MIN_CHARS and len(text) >= COMPRESS_MIN_CHARS:
+            self._description = zlib.compress(text.encode("utf-8"), 1)
+        else:
+            self._description = text
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Job":
+        return cls(**{field: data.get(field) for field in cls.FIELDS if field in data})
+
+    def to_dict(self) -> dict:
+        data = {field: getattr(self, field) for field in self.FIELDS}
+        if not data["description"]:
+            del data["description"]
+        return data
+
+    def __getitem__(self, field: str):
+        if field not in self.FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def get(self, field: str, default=None):
+        if field not in self.FIELDS:
+            return default
+        value = getattr(self, field)
+        return default if field == "description" and not value else value
+
+    def __repr__(self) -> str:
+        return f"Job({self.job_id!r}, {self.company!r}, {self.title!r})"
+
+
+def jobs_from_dicts(rows: Iterable[dict]) -> list[Job]:
+    """Rebuilds Jobs from their to_dict() form, e.g. a cached board response."""
+    return [Job.from_dict(row) for row in rows]
+
+
+def _load(name: str):
+    module_name = PROVIDER_MODULES.get(name)
+    if module_name is None:
+        raise ValueError(f"Unknown provider: {name!r}. Available: {list(PROVIDER_MODULES)}")
+    started = time.perf_counter()
+    module = importlib.import_module(module_name)  # a dict lookup after the first call
+    if name not in IMPORT_TIMES:
+        IMPORT_TIMES[name] = time.perf_counter() - started
+        logger.debug(f"Imported {module_name} in {IMPORT_TIMES[name] * 1000:.1f} ms")
+    return module
+
 
 def get_provider(name: str):
-    fn = REGISTRY.get(name)
-    if fn is None:
-        raise ValueError(f"Unknown provider: {name!r}. Available: {list(REGISTRY)}")
-    return fn
+    return _load(name).fetch
+
+
+def get_async_provider(name: str):
+    return _load(name).fetch_async
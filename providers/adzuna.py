@@ -11,13 +11,16 @@ Set environment variables:
     ADZUNA_APP_KEY=your_app_key
 """
 
-import json
+import asyncio
 import logging
 import os
 import urllib.error
-import urllib.request
+from datetime import date
+from typing import Optional
 from urllib.parse import urlencode
 
+from providers import Job, transport
+
 logger = logging.getLogger(__name__)
 
 ADZUNA_APP_ID = os.environ.get("ADZUNA_APP_ID", "")
@@ -34,9 +37,26 @@ SEARCH_QUERIES = [
 ]
 
 BASE_URL = "https://api.adzuna.com/v1/api/jobs/us/search/{page}"
+MAX_DAYS_OLD = 5
 
 
-def _fetch_page(query: str, page: int = 1, results_per_page: int = 50) -> list[dict]:
+def _max_days_old(since: Optional[str]) -> int:
+    """Narrows the search window to the days since the newest posting already seen."""
+    if not since:
+        return MAX_DAYS_OLD
+    try:
+        days = (date.today() - date.fromisoformat(since)).days + 1
+    except ValueError:
+        return MAX_DAYS_OLD
+    return max(1, min(days, MAX_DAYS_OLD))
+
+
+async def _fetch_page(
+    query: str,
+    page: int = 1,
+    results_per_page: int = 50,
+    max_days_old: int = MAX_DAYS_OLD,
+) -> list[dict]:
     if not ADZUNA_APP_ID or not ADZUNA_APP_KEY:
         return []
 
@@ -48,15 +68,13 @@ def _fetch_page(query: str, page: int = 1, results_per_page: int = 50) -> list[d
         "where": "United States",
         "content-type": "application/json",
         "sort_by": "date",               # newest first
-        "max_days_old": 5,               # only recent jobs
+        "max_days_old": max_days_old,    # only recent jobs
     }
     url = BASE_URL.format(page=page) + "?" + urlencode(params)
 
     try:
-        req = urllib.request.Request(url, headers={"User-Agent": "JobRadar/1.0"})
-        with urllib.request.urlopen(req, timeout=15) as r:
-            data = json.loads(r.read())
-            return data.get("results", [])
+        data = await transport.aget_json(url)
+        return data.get("results", [])
     except urllib.error.HTTPError as e:
         logger.warning(f"Adzuna HTTP {e.code} for query '{query}': {e.reason}")
         return []
@@ -65,7 +83,7 @@ def _fetch_page(query: str, page: int = 1, results_per_page: int = 50) -> list[d
         return []
 
 
-def _normalize(raw: dict) -> dict:
+def _normalize(raw: dict) -> Job:
     """Convert Adzuna job format to our standard job dict."""
     company = raw.get("company", {}).get("display_name", "Unknown")
     location_parts = []
@@ -78,32 +96,38 @@ def _normalize(raw: dict) -> dict:
     created = raw.get("created", "")
     posted_at = created[:10] if created else None
 
-    return {
-        "id": f"adzuna_{raw.get('id', '')}",
-        "company": company,
-        "title": raw.get("title", ""),
-        "location": location,
-        "posted_at": posted_at,
-        "apply_url": raw.get("redirect_url", ""),
-        "source": "adzuna",
-    }
+    return Job(
+        job_id=f"adzuna-{raw.get('id', '')}",
+        company=company,
+        title=raw.get("title", ""),
+        location=location,
+        posted_at=posted_at,
+        apply_url=raw.get("redirect_url", ""),
+        provider="adzuna",
+    )
+
+
+def fetch_jobs(since: Optional[str] = None) -> list[Job]:
+    return asyncio.run(fetch_jobs_async(since))
 
 
-def fetch_jobs() -> list[dict]:
+async def fetch_jobs_async(since: Optional[str] = None) -> list[Job]:
     if not ADZUNA_APP_ID or not ADZUNA_APP_KEY:
         logger.warning("Adzuna: ADZUNA_APP_ID / ADZUNA_APP_KEY not set — skipping.")
         return []
 
     seen_ids: set[str] = set()
-    jobs: list[dict] = []
+    jobs: list[Job] = []
 
-    for query in SEARCH_QUERIES:
-        raw_jobs = _fetch_page(query)
+    # Queries run concurrently; results are merged in SEARCH_QUERIES order
+    max_days_old = _max_days_old(since)
+    pages = await asyncio.gather(*(_fetch_page(q, max_days_old=max_days_old) for q in SEARCH_QUERIES))
+    for query, raw_jobs in zip(SEARCH_QUERIES, pages):
         logger.info(f"Adzuna '{query}': {len(raw_jobs)} raw results")
         for raw in raw_jobs:
             job = _normalize(raw)
-            if job["id"] not in seen_ids:
-                seen_ids.add(job["id"])
+            if job.job_id not in seen_ids:
+                seen_ids.add(job.job_id)
                 jobs.append(job)
 
     logger.info(f"Adzuna total (deduplicated): {len(jobs)} jobs")
@@ -4,26 +4,24 @@ Ashby ATS — GET job board API, no auth needed.
 API: https://api.ashbyhq.com/posting-api/job-board/{company_id}
 """
 
-import json
+import asyncio
 import logging
 import urllib.error
-import urllib.request
-from typing import Optional
+from typing import Iterable, Iterator, Optional
+
+from providers import Job, jobs_from_dicts, transport
 
 logger = logging.getLogger(__name__)
 
 BASE_URL = "https://api.ashbyhq.com/posting-api/job-board/{company_id}"
+# Part of the HTTP cache format key; bump when _iter_jobs changes
+NORMALIZE_VERSION = 1
 
 
-def _fetch(company_id: str) -> Optional[dict]:
+async def _fetch(company_id: str, parse, fmt: str) -> Optional[list[Job]]:
     url = BASE_URL.format(company_id=company_id)
     try:
-        req = urllib.request.Request(
-            url,
-            headers={"User-Agent": "JobRadar/1.0"},
-        )
-        with urllib.request.urlopen(req, timeout=15) as resp:
-            return json.loads(resp.read().decode("utf-8"))
+        return await transport.aget_cached(url, parse, items="jobs.item", revive=jobs_from_dicts, fmt=fmt)
     except urllib.error.HTTPError as e:
         logger.warning(f"[ashby] {company_id} → HTTP {e.code}")
     except Exception as e:
@@ -31,15 +29,9 @@ def _fetch(company_id: str) -> Optional[dict]:
     return None
 
 
-def fetch(company_cfg: dict) -> list[dict]:
-    company_id = company_cfg.get("id", "")
-    name = company_cfg.get("name", company_id)
-    raw = _fetch(company_id)
-    if not raw:
-        return []
-
-    jobs = []
-    for posting in raw.get("jobs", []):
+def _iter_jobs(postings: Iterable[dict], name: str) -> Iterator[Job]:
+    """Normalizes postings as they are parsed off the wire."""
+    for posting in postings:
         if not isinstance(posting, dict):
             continue
         loc_data = posting.get("location") or posting.get("locationName") or ""
@@ -48,16 +40,28 @@ def fetch(company_cfg: dict) -> list[dict]:
         else:
             location = str(loc_data)
 
-        jobs.append({
-            "job_id": f"ashby-{posting.get('id', '')}",
-            "company": name,
-            "title": posting.get("title", ""),
-            "location": location,
-            "posted_at": posting.get("publishedAt") or posting.get("updatedAt"),
-            "apply_url": posting.get("jobUrl", ""),
-            "description": posting.get("descriptionHtml") or posting.get("description", ""),
-            "provider": "ashby",
-        })
+        yield Job(
+            job_id=f"ashby-{posting.get('id', '')}",
+            company=name,
+            title=posting.get("title", ""),
+            location=location,
+            posted_at=posting.get("publishedAt") or posting.get("updatedAt"),
+            apply_url=posting.get("jobUrl", ""),
+            description=posting.get("descriptionHtml") or posting.get("description", ""),
+            provider="ashby",
+        )
+
+
+def fetch(company_cfg: dict) -> list[Job]:
+    return asyncio.run(fetch_async(company_cfg))
+
+
+async def fetch_async(company_cfg: dict) -> list[Job]:
+    company_id = company_cfg.get("id", "")
+    name = company_cfg.get("name", company_id)
+    jobs = await _fetch(company_id, lambda postings: list(_iter_jobs(postings, name)), f"{NORMALIZE_VERSION}:{name}")
+    if not jobs:
+        return []
 
     logger.info(f"[ashby] {name}: {len(jobs)} jobs")
     return jobs
@@ -2,25 +2,31 @@
 providers/greenhouse.py
 Greenhouse ATS — clean public JSON API, no auth needed.
 API: https://boards-api.greenhouse.io/v1/boards/{board_token}/jobs
+     https://boards-api.greenhouse.io/v1/boards/{board_token}/jobs/{job_id}
 """
 
-import json
+import asyncio
 import logging
 import urllib.error
-import urllib.request
-from typing import Optional
+from typing import Iterable, Iterator, Optional
+
+from filter import is_recent_enough, is_relevant_title
+from providers import Job, jobs_from_dicts, transport
 
 logger = logging.getLogger(__name__)
 
 BASE_URL = "https://boards-api.greenhouse.io/v1/boards/{token}/jobs?content=true"
+LIST_URL = "https://boards-api.greenhouse.io/v1/boards/{token}/jobs"
+JOB_URL = "https://boards-api.greenhouse.io/v1/boards/{token}/jobs/{job_id}"
+# Path of the postings array in board responses, for streaming parses
+ITEMS = "jobs.item"
+# Bump when _normalize_job's output changes, so cached boards are re-parsed
+NORMALIZE_VERSION = 1
 
 
-def _fetch(token: str) -> Optional[dict]:
-    url = BASE_URL.format(token=token)
+async def _fetch(url: str, token: str, parse, items: Optional[str], revive, fmt: str):
     try:
-        req = urllib.request.Request(url, headers={"User-Agent": "JobRadar/1.0"})
-        with urllib.request.urlopen(req, timeout=15) as resp:
-            return json.loads(resp.read().decode("utf-8"))
+        return await transport.aget_cached(url, parse, items=items, revive=revive, fmt=fmt)
     except urllib.error.HTTPError as e:
         logger.warning(f"[greenhouse] {token} → HTTP {e.code}")
     except Exception as e:
@@ -28,39 +34,96 @@ def _fetch(token: str) -> Optional[dict]:
     return None
 
 
-def fetch(company_cfg: dict) -> list[dict]:
+def _location(job: dict) -> str:
+    # `offices` is the authoritative region field; `location.name` is often
+    # a free-text string like "N/A" that doesn't reliably indicate country.
+    office_names = [o.get("name", "") for o in job.get("offices", []) if o.get("name")]
+    if any(n == "US" for n in office_names):
+        return "United States"
+    if office_names:
+        return ", ".join(office_names)  # e.g. "Canada Locations"
+    loc = job.get("location", {})
+    return loc.get("name", "") if isinstance(loc, dict) else str(loc or "")
+
+
+def _normalize_job(job: dict, name: str) -> Job:
+    return Job(
+        job_id=f"greenhouse-{job.get('id', '')}",
+        company=name,
+        title=job.get("title", ""),
+        location=_location(job),
+        posted_at=max(
+            (job.get("first_published") or ""),
+            (job.get("updated_at") or ""),
+        ) or None,
+        apply_url=job.get("absolute_url", ""),
+        description=job.get("content", ""),   # HTML — stripped in filter.py
+        provider="greenhouse",
+    )
+
+
+def _iter_jobs(postings: Iterable[dict], name: str) -> Iterator[Job]:
+    """Normalizes postings as they are parsed off the wire."""
+    for job in postings:
+        if isinstance(job, dict):
+            yield _normalize_job(job, name)
+
+
+def _is_candidate(job: Job) -> bool:
+    """
+    Cheap pre-filter run on the list payload. Location is left to the full
+    filter: the list endpoint omits `offices`, which is what decides country.
+    """
+    return is_relevant_title(job.title) and is_recent_enough(job.posted_at)
+
+
+async def _hydrate(token: str, job: Job) -> None:
+    """Fill in description and office-based location from the per-job endpoint."""
+    gh_id = job.job_id.removeprefix("greenhouse-")
+    # Not cached: one file per posting would pile up in state/http_cache
+    url = JOB_URL.format(token=token, job_id=gh_id)
+    try:
+        raw = await transport.aget_json(url)
+    except urllib.error.HTTPError as e:
+        logger.warning(f"[greenhouse] {token} → HTTP {e.code}")
+        job.incomplete = True  # list-payload location differs from the office-based one
+        return
+    except Exception as e:
+        logger.warning(f"[greenhouse] {token} → {e}")
+        job.incomplete = True
+        return
+    job.description = raw.get("content", "")
+    job.location = _location(raw) or job.location
+
+
+def fetch(company_cfg: dict) -> list[Job]:
+    return asyncio.run(fetch_async(company_cfg))
+
+
+async def fetch_async(company_cfg: dict) -> list[Job]:
+    """
+    Two-phase by default: fetch the lightweight job list, pre-filter on title
+    and date, then hydrate descriptions only for the surviving jobs. Set
+    `two_phase: false` on a company to use the single `?content=true` request.
+    """
     token = company_cfg.get("id", "")
     name = company_cfg.get("name", token)
-    raw = _fetch(token)
-    if not raw:
+    parse = lambda postings: list(_iter_jobs(postings, name))
+    fmt = f"{NORMALIZE_VERSION}:{name}"
+
+    if not company_cfg.get("two_phase", True):
+        jobs = await _fetch(BASE_URL.format(token=token), token, parse, ITEMS, jobs_from_dicts, fmt)
+        if not jobs:
+            return []
+        logger.info(f"[greenhouse] {name}: {len(jobs)} jobs")
+        return jobs
+
+    jobs = await _fetch(LIST_URL.format(token=token), token, parse, ITEMS, jobs_from_dicts, fmt)
+    if not jobs:
         return []
 
-    jobs = []
-    for job in raw.get("jobs", []):
-        # `offices` is the authoritative region field; `location.name` is often
-        # a free-text string like "N/A" that doesn't reliably indicate country.
-        office_names = [o.get("name", "") for o in job.get("offices", []) if o.get("name")]
-        if any(n == "US" for n in office_names):
-            location = "United States"
-        elif office_names:
-            location = ", ".join(office_names)  # e.g. "Canada Locations"
-        else:
-            loc = job.get("location", {})
-            location = loc.get("name", "") if isinstance(loc, dict) else str(loc or "")
-
-        jobs.append({
-            "job_id": f"greenhouse-{job.get('id', '')}",
-            "company": name,
-            "title": job.get("title", ""),
-            "location": location,
-            "posted_at": max(
-                (job.get("first_published") or ""),
-                (job.get("updated_at") or ""),
-            ) or None,
-            "apply_url": job.get("absolute_url", ""),
-            "description": job.get("content", ""),   # HTML — stripped in filter.py
-            "provider": "greenhouse",
-        })
-
-    logger.info(f"[greenhouse] {name}: {len(jobs)} jobs")
+    candidates = [j for j in jobs if _is_candidate(j)]
+    await asyncio.gather(*(_hydrate(token, j) for j in candidates))
+
+    logger.info(f"[greenhouse] {name}: {len(jobs)} jobs ({len(candidates)} hydrated)")
     return jobs
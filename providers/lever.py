@@ -4,24 +4,26 @@ Lever ATS — public JSON API, no auth needed.
 API: https://api.lever.co/v0/postings/{company_id}?mode=json
 """
 
-import json
+import asyncio
 import logging
 import urllib.error
-import urllib.request
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Iterable, Iterator, Optional
+
+from providers import Job, jobs_from_dicts, transport
 
 logger = logging.getLogger(__name__)
 
 BASE_URL = "https://api.lever.co/v0/postings/{company_id}?mode=json"
+# Part of the HTTP cache format key; bump when _iter_jobs changes
+NORMALIZE_VERSION = 1
 
 
-def _fetch(company_id: str) -> Optional[list]:
+async def _fetch(company_id: str, parse, fmt: str) -> Optional[list[Job]]:
     url = BASE_URL.format(company_id=company_id)
     try:
-        req = urllib.request.Request(url, headers={"User-Agent": "JobRadar/1.0"})
-        with urllib.request.urlopen(req, timeout=15) as resp:
-            return json.loads(resp.read().decode("utf-8"))
+        # The response is a bare array of postings
+        return await transport.aget_cached(url, parse, items="item", revive=jobs_from_dicts, fmt=fmt)
     except urllib.error.HTTPError as e:
         logger.warning(f"[lever] {company_id} → HTTP {e.code}")
     except Exception as e:
@@ -29,29 +31,35 @@ def _fetch(company_id: str) -> Optional[list]:
     return None
 
 
-def fetch(company_cfg: dict) -> list[dict]:
-    company_id = company_cfg.get("id", "")
-    name = company_cfg.get("name", company_id)
-    raw = _fetch(company_id)
-    if not raw:
-        return []
-
-    jobs = []
-    for posting in raw:
+def _iter_jobs(postings: Iterable[dict], name: str) -> Iterator[Job]:
+    """Normalizes postings as they are parsed off the wire."""
+    for posting in postings:
         if not isinstance(posting, dict):
             continue
         categories = posting.get("categories", {})
         location = categories.get("location", "") or posting.get("workplaceType", "")
-        jobs.append({
-            "job_id": f"lever-{posting.get('id', '')}",
-            "company": name,
-            "title": posting.get("text", ""),
-            "location": location,
-            "posted_at": datetime.fromtimestamp(posting["createdAt"] / 1000, tz=timezone.utc).date().isoformat() if posting.get("createdAt") else None,
-            "apply_url": posting.get("hostedUrl", ""),
-            "description": posting.get("description") or posting.get("descriptionPlain", ""),
-            "provider": "lever",
-        })
+        yield Job(
+            job_id=f"lever-{posting.get('id', '')}",
+            company=name,
+            title=posting.get("text", ""),
+            location=location,
+            posted_at=datetime.fromtimestamp(posting["createdAt"] / 1000, tz=timezone.utc).date().isoformat() if posting.get("createdAt") else None,
+            apply_url=posting.get("hostedUrl", ""),
+            description=posting.get("description") or posting.get("descriptionPlain", ""),
+            provider="lever",
+        )
+
+
+def fetch(company_cfg: dict) -> list[Job]:
+    return asyncio.run(fetch_async(company_cfg))
+
+
+async def fetch_async(company_cfg: dict) -> list[Job]:
+    company_id = company_cfg.get("id", "")
+    name = company_cfg.get("name", company_id)
+    jobs = await _fetch(company_id, lambda postings: list(_iter_jobs(postings, name)), f"{NORMALIZE_VERSION}:{name}")
+    if not jobs:
+        return []
 
     logger.info(f"[lever] {name}: {len(jobs)} jobs")
     return jobs
@@ -2,22 +2,26 @@
 providers/smartrecruiters.py
 SmartRecruiters ATS — paginated public API, no auth needed.
 API: https://api.smartrecruiters.com/v1/companies/{company_id}/postings
+
+Postings are listed newest first, so with a `since` watermark paging stops
+after the first page whose postings were all released before it.
 """
 
-import json
+import asyncio
 import logging
 import urllib.error
 import urllib.parse
-import urllib.request
 from typing import Optional
 
+from providers import Job, PartialFetch, transport
+
 logger = logging.getLogger(__name__)
 
 BASE_URL = "https://api.smartrecruiters.com/v1/companies/{company_id}/postings"
 PAGE_SIZE = 100
 
 
-def _fetch_page(company_id: str, offset: int = 0) -> Optional[dict]:
+async def _fetch_page(company_id: str, offset: int = 0) -> Optional[dict]:
     params = urllib.parse.urlencode({
         "limit": PAGE_SIZE,
         "offset": offset,
@@ -25,9 +29,7 @@ def _fetch_page(company_id: str, offset: int = 0) -> Optional[dict]:
     })
     url = f"{BASE_URL.format(company_id=company_id)}?{params}"
     try:
-        req = urllib.request.Request(url, headers={"User-Agent": "JobRadar/1.0"})
-        with urllib.request.urlopen(req, timeout=15) as resp:
-            return json.loads(resp.read().decode("utf-8"))
+        return await transport.aget_json(url)
     except urllib.error.HTTPError as e:
         logger.warning(f"[smartrecruiters] {company_id} → HTTP {e.code}")
     except Exception as e:
@@ -35,19 +37,28 @@ def _fetch_page(company_id: str, offset: int = 0) -> Optional[dict]:
     return None
 
 
-def fetch(company_cfg: dict) -> list[dict]:
+def fetch(company_cfg: dict) -> list[Job]:
+    return asyncio.run(fetch_async(company_cfg))
+
+
+async def fetch_async(company_cfg: dict) -> list[Job]:
     company_id = company_cfg.get("id", "")
     name = company_cfg.get("name", company_id)
+    since = company_cfg.get("since")
 
     all_jobs = []
     offset = 0
+    pages = 0
     while True:
-        page = _fetch_page(company_id, offset)
+        page = await _fetch_page(company_id, offset)
         if not page:
+            if pages:
+                raise PartialFetch(all_jobs, f"SmartRecruiters page at offset {offset} failed")
             break
         content = page.get("content", [])
         if not content:
             break
+        pages += 1
         for item in content:
             loc = item.get("location", {})
             if isinstance(loc, dict):
@@ -55,19 +66,22 @@ def fetch(company_cfg: dict) -> list[dict]:
                 location = ", ".join(p for p in parts if p)
             else:
                 location = str(loc or "")
-            all_jobs.append({
-                "job_id": f"smartrecruiters-{item.get('id', '')}",
-                "company": name,
-                "title": item.get("name", ""),
-                "location": location,
-                "posted_at": item.get("releasedDate"),
-                "apply_url": f"https://jobs.smartrecruiters.com/{company_id}/{item.get('id', '')}",
-                "provider": "smartrecruiters",
-            })
+            all_jobs.append(Job(
+                job_id=f"smartrecruiters-{item.get('id', '')}",
+                company=name,
+                title=item.get("name", ""),
+                location=location,
+                posted_at=item.get("releasedDate"),
+                apply_url=f"https://jobs.smartrecruiters.com/{company_id}/{item.get('id', '')}",
+                provider="smartrecruiters",
+            ))
         total = page.get("totalFound", 0)
         offset += PAGE_SIZE
         if offset >= total:
             break
+        if since and all(str(item.get("releasedDate") or "")[:10] < since for item in content):
+            logger.info(f"[smartrecruiters] {name}: reached watermark {since} at offset {offset}")
+            break
 
-    logger.info(f"[smartrecruiters] {name}: {len(all_jobs)} jobs")
+    logger.info(f"[smartrecruiters] {name}: {len(all_jobs)} jobs ({pages} pages)")
     return all_jobs
@@ -0,0 +1,557 @@
+"""
+providers/transport.py
+Shared HTTP engine for all providers.
+
+Keeps a pool of keep-alive connections per host so a scan pays one TCP+TLS
+handshake per host connection instead of one per request. The async helpers
+run requests on a dedicated thread pool, bounded by a global and a per-host
+concurrency limit.
+
+Board GETs can go through a persistent conditional-GET cache: validators
+(ETag / Last-Modified) are stored next to the provider's parsed result, and
+a 304 returns that result without downloading or parsing the board again.
+
+JSON is decoded with orjson straight from bytes when it is installed. Board
+payloads with a known item path (e.g. Greenhouse's `jobs.item`) and a body
+of at least STREAM_MIN_BYTES (STREAM_MIN_GZIP_BYTES when gzip-encoded) are
+parsed incrementally with ijson when it is installed: postings are decoded
+and normalized while the body is still downloading, so the raw body and the
+full raw tree are never held in memory. Both packages are optional; the
+stdlib json module is the fallback.
+
+Every request and JSON parse is recorded in metrics.py against the company
+whose fetch task issued it (the context is carried into the thread pool).
+
+Errors mirror urllib: non-2xx responses raise urllib.error.HTTPError, so
+providers keep their existing `except urllib.error.HTTPError` handling.
+Redirects are followed (up to MAX_REDIRECTS hops) and HTTP_PROXY / HTTPS_PROXY
+/ NO_PROXY are honoured, as urlopen does.
+"""
+
+import asyncio
+import base64
+import concurrent.futures
+import contextlib
+import contextvars
+import functools
+import gzip
+import hashlib
+import http.client
+import json
+import logging
+import os
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import weakref
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional
+
+import metrics
+from fileio import read_json, write_json
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # optional dependency
+    ijson = None
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "JobRadar/1.0"
+DEFAULT_TIMEOUT = 15
+MAX_CONCURRENCY = int(os.environ.get("JOB_RADAR_WORKERS", "10"))
+MAX_PER_HOST = int(os.environ.get("JOB_RADAR_PER_HOST", "6"))
+MAX_REDIRECTS = 5
+# Set to an empty string to disable the conditional-GET cache
+HTTP_CACHE_DIR = os.environ.get("JOB_RADAR_HTTP_CACHE", "state/http_cache")
+# Cache entries unused for this many days are pruned, then the oldest beyond the size cap
+HTTP_CACHE_MAX_AGE_DAYS = float(os.environ.get("JOB_RADAR_HTTP_CACHE_MAX_AGE_DAYS", "14"))
+HTTP_CACHE_MAX_MB = int(os.environ.get("JOB_RADAR_HTTP_CACHE_MAX_MB", "256"))
+# Board bodies at least this large (or of unknown length) are parsed incrementally
+# with ijson; smaller ones are faster to read whole and decode in one call
+STREAM_MIN_BYTES = int(os.environ.get("JOB_RADAR_STREAM_MIN_BYTES", str(4 * 1024 * 1024)))
+# Same threshold for gzip bodies, whose Content-Length is the compressed size
+# (board JSON compresses roughly 8:1)
+STREAM_MIN_GZIP_BYTES = int(os.environ.get("JOB_RADAR_STREAM_MIN_GZIP_BYTES", str(512 * 1024)))
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+_REDIRECT_CODES = {301, 302, 303, 307, 308}
+
+# Errors that mean a reused keep-alive connection was closed by the server
+_STALE_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+
+
+class ConnectionPool:
+    """Thread-safe pool of idle keep-alive connections keyed by (scheme, host, port)."""
+
+    def __init__(self, max_idle_per_host: int = MAX_PER_HOST):
+        self.max_idle_per_host = max_idle_per_host
+        self._idle: dict[tuple, deque] = defaultdict(deque)
+        self._lock = threading.Lock()
+
+    def _acquire(self, key: tuple, timeout: float) -> tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle[key]
+            if idle:
+                conn = idle.pop()
+                # http.client only applies .timeout when it opens the socket
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+        scheme, host, port, proxy = key
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        if proxy is None:
+            return cls(host, port, timeout=timeout), False
+        proxy_host, proxy_port, proxy_auth = proxy
+        conn = cls(proxy_host, proxy_port, timeout=timeout)
+        if scheme == "https":
+            conn.set_tunnel(host, port, headers={"Proxy-Authorization": proxy_auth} if proxy_auth else None)
+        return conn, False
+
+    def _release(self, key: tuple, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle[key]
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            conns = [c for idle in self._idle.values() for c in idle]
+            self._idle.clear()
+        for conn in conns:
+            conn.close()
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes],
+        headers: Optional[dict],
+        timeout: float,
+    ) -> tuple[tuple, http.client.HTTPConnection, http.client.HTTPResponse]:
+        """Sends the request, following redirects through the pool for each hop's host."""
+        hdrs = {"User-Agent": USER_AGENT, "Accept-Encoding": "gzip"}
+        hdrs.update(headers or {})
+        for _ in range(MAX_REDIRECTS):
+            key, conn, resp = self._open(method, url, body, hdrs, timeout)
+            location = resp.getheader("Location")
+            if resp.status not in _REDIRECT_CODES or not location:
+                return key, conn, resp
+            try:
+                resp.read()
+            except Exception:
+                conn.close()
+                raise
+            self._finish(key, conn, resp)
+            url = urllib.parse.urljoin(url, location)
+            # Like urlopen: 307/308 repeat the request, the others become a bodiless GET
+            if resp.status not in (307, 308) and method != "HEAD":
+                method, body = "GET", None
+                hdrs = {k: v for k, v in hdrs.items() if k.lower() not in ("content-type", "content-length")}
+        return self._open(method, url, body, hdrs, timeout)
+
+    def _open(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes],
+        hdrs: dict,
+        timeout: float,
+    ) -> tuple[tuple, http.client.HTTPConnection, http.client.HTTPResponse]:
+        parts = urllib.parse.urlsplit(url)
+        proxy = _proxy_for(parts)
+        key = (parts.scheme, parts.hostname, parts.port, proxy)
+        if proxy is not None and parts.scheme == "http":
+            path = url  # plain-HTTP proxies take the absolute URL
+            if proxy[2]:
+                hdrs = {**hdrs, "Proxy-Authorization": proxy[2]}
+        else:
+            path = parts.path or "/"
+            if parts.query:
+                path += "?" + parts.query
+
+        while True:
+            conn, reused = self._acquire(key, timeout)
+            try:
+                conn.request(method, path, body=body, headers=hdrs)
+                return key, conn, conn.getresponse()
+            except _STALE_ERRORS:
+                conn.close()
+                if reused:
+                    continue  # server dropped an idle connection — retry on a fresh one
+                raise
+            except Exception:
+                conn.close()
+                raise
+
+    def _finish(self, key: tuple, conn: http.client.HTTPConnection, resp: http.client.HTTPResponse) -> None:
+        if resp.will_close or not resp.isclosed():
+            conn.close()  # server closes it, or the body was not read to the end
+        else:
+            self._release(key, conn)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes] = None,
+        headers: Optional[dict] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> tuple[int, http.client.HTTPMessage, bytes]:
+        """
+        Send a request, returning (status, headers, body).
+        Raises HTTPError on anything other than 2xx or 304 Not Modified.
+        """
+        started = time.perf_counter()
+        key, conn, resp = self._send(method, url, body, headers, timeout)
+        try:
+            data = resp.read()
+        except Exception:
+            conn.close()
+            raise
+        self._finish(key, conn, resp)
+        metrics.record_request(len(data), time.perf_counter() - started, not_modified=resp.status == 304)
+
+        if resp.getheader("Content-Encoding", "").lower() == "gzip":
+            data = gzip.decompress(data)
+        if not 200 <= resp.status < 300 and resp.status != 304:
+            raise urllib.error.HTTPError(url, resp.status, resp.reason, resp.headers, None)
+        return resp.status, resp.headers, data
+
+    @contextlib.contextmanager
+    def stream(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes] = None,
+        headers: Optional[dict] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> Iterator[tuple[int, http.client.HTTPMessage, "_CountingReader"]]:
+        """
+        Like request(), but yields (status, headers, reader) with the body
+        still on the wire; gzip is decoded as it is read. A 304 yields an
+        empty reader.
+        """
+        started = time.perf_counter()
+        key, conn, resp = self._send(method, url, body, headers, timeout)
+        reader = _CountingReader(resp)
+        try:
+            if not 200 <= resp.status < 300 and resp.status != 304:
+                resp.read()
+                raise urllib.error.HTTPError(url, resp.status, resp.reason, resp.headers, None)
+            if resp.getheader("Content-Encoding", "").lower() == "gzip":
+                yield resp.status, resp.headers, gzip.GzipFile(fileobj=reader, mode="rb")
+            else:
+                yield resp.status, resp.headers, reader
+            resp.read()  # drain anything the parser left, so the connection can be reused
+        except BaseException:
+            conn.close()
+            raise
+        else:
+            self._finish(key, conn, resp)
+        finally:
+            metrics.record_request(reader.count, time.perf_counter() - started, not_modified=resp.status == 304)
+
+
+def _proxy_for(parts: urllib.parse.SplitResult) -> Optional[tuple]:
+    """(host, port, Proxy-Authorization or None) of the proxy for this URL, from the environment."""
+    proxy_url = urllib.request.getproxies().get(parts.scheme)
+    if not proxy_url or urllib.request.proxy_bypass(parts.netloc):
+        return None
+    if "://" not in proxy_url:
+        proxy_url = "http://" + proxy_url
+    proxy = urllib.parse.urlsplit(proxy_url)
+    auth = None
+    if proxy.username:
+        creds = f"{urllib.parse.unquote(proxy.username)}:{urllib.parse.unquote(proxy.password or '')}"
+        auth = "Basic " + base64.b64encode(creds.encode("utf-8")).decode("ascii")
+    return proxy.hostname, proxy.port, auth
+
+
+class _CountingReader:
+    """File-like wrapper that counts the bytes read off the wire."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.count = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.raw.read() if size is None or size < 0 else self.raw.read(size)
+        self.count += len(data)
+        return data
+
+    def readable(self) -> bool:
+        return True
+
+
+class ResponseCache:
+    """
+    On-disk cache of parsed board responses. Each URL gets a small header
+    file (validators, result format) and a separate body file with the
+    parsed result, so a conditional GET reads only the header and the body
+    is loaded on a 304 alone.
+
+    `fmt` identifies the shape of the parsed result (provider normalization
+    version, company name); a header with a different fmt is ignored, so a
+    normalization change is never served from a 304. Entries not used for
+    HTTP_CACHE_MAX_AGE_DAYS are removed by prune(), which also trims the
+    least recently used entries beyond HTTP_CACHE_MAX_MB.
+    """
+
+    def __init__(self, directory: str = HTTP_CACHE_DIR):
+        self.directory = Path(directory) if directory else None
+
+    def _paths(self, url: str) -> tuple[Path, Path]:
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}.json", self.directory / f"{digest}.body.json"
+
+    def get(self, url: str, fmt: str = "") -> Optional[dict]:
+        """Returns the validators stored for `url`, without its body."""
+        if self.directory is None:
+            return None
+        header, body = self._paths(url)
+        try:
+            entry = read_json(header)
+        except (OSError, ValueError):
+            return None
+        if entry.get("url") != url or entry.get("format", "") != fmt or not body.exists():
+            return None
+        return entry
+
+    def body(self, url: str):
+        """Loads the parsed result for `url` and marks the entry as used; None if it is gone."""
+        header, body = self._paths(url)
+        try:
+            result = read_json(body)
+        except (OSError, ValueError):
+            self.drop(url)
+            return None
+        try:
+            os.utime(header)
+        except OSError:
+            pass
+        return result
+
+    def put(self, url: str, etag: Optional[str], last_modified: Optional[str], body, fmt: str = "") -> None:
+        if self.directory is None or not (etag or last_modified):
+            return
+        header, body_path = self._paths(url)
+        try:
+            # Body first: a header is only ever written next to its body
+            write_json(body_path, body)
+            write_json(header, {"url": url, "format": fmt, "etag": etag, "last_modified": last_modified})
+        except OSError as e:
+            logger.warning(f"[http-cache] could not write entry for {url}: {e}")
+
+    def drop(self, url: str) -> None:
+        for path in self._paths(url):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def prune(
+        self,
+        max_age_days: float = HTTP_CACHE_MAX_AGE_DAYS,
+        max_bytes: int = HTTP_CACHE_MAX_MB * 1024 * 1024,
+    ) -> None:
+        """Removes entries unused for `max_age_days`, then the oldest beyond `max_bytes`."""
+        if self.directory is None or not self.directory.is_dir():
+            return
+        entries = []
+        for header in self.directory.glob("*.json"):
+            if header.name.endswith(".body.json"):
+                continue
+            body = header.with_name(header.name[:-len(".json")] + ".body.json")
+            try:
+                used = header.stat().st_mtime
+                size = header.stat().st_size + (body.stat().st_size if body.exists() else 0)
+            except OSError:
+                continue
+            entries.append((used, size, header, body))
+
+        cutoff = time.time() - max_age_days * 86400
+        total = sum(size for _, size, _, _ in entries)
+        removed = 0
+        for used, size, header, body in sorted(entries, key=lambda e: e[0]):
+            if used >= cutoff and total <= max_bytes:
+                break
+            for path in (header, body):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            total -= size
+            removed += 1
+        # Bodies whose header is gone (e.g. a crash between the two writes)
+        for body in self.directory.glob("*.body.json"):
+            if not body.with_name(body.name[:-len(".body.json")] + ".json").exists():
+                try:
+                    body.unlink()
+                except OSError:
+                    pass
+        if removed:
+            logger.info(f"[http-cache] pruned {removed} entries; {total / 2**20:.1f} MB kept")
+
+
+POOL = ConnectionPool()
+CACHE = ResponseCache()
+_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=MAX_CONCURRENCY, thread_name_prefix="job-radar-http",
+)
+# Semaphores are bound to an event loop, so each loop gets its own set
+_loop_limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, tuple]" = weakref.WeakKeyDictionary()
+
+
+def _limits(host: str) -> tuple[asyncio.Semaphore, asyncio.Semaphore]:
+    loop = asyncio.get_running_loop()
+    limits = _loop_limits.get(loop)
+    if limits is None:
+        limits = _loop_limits[loop] = (asyncio.Semaphore(MAX_CONCURRENCY), {})
+    global_sem, per_host = limits
+    host_sem = per_host.get(host)
+    if host_sem is None:
+        host_sem = per_host[host] = asyncio.Semaphore(MAX_PER_HOST)
+    return global_sem, host_sem
+
+
+def _parse(data: bytes, parse: Optional[Callable] = None):
+    started = time.perf_counter()
+    result = _loads(data)
+    if parse is not None:
+        result = parse(result)
+    metrics.record_parse(time.perf_counter() - started)
+    return result
+
+
+def _select(tree, items: str) -> Iterable:
+    """Walks an ijson-style item path ('jobs.item', 'item') through a parsed tree."""
+    for key in items.split(".")[:-1]:
+        tree = tree.get(key, []) if isinstance(tree, dict) else []
+    return tree if isinstance(tree, list) else []
+
+
+def get_json(url: str, headers: Optional[dict] = None, timeout: float = DEFAULT_TIMEOUT):
+    _, _, data = POOL.request("GET", url, headers=headers, timeout=timeout)
+    return _parse(data)
+
+
+def get_text(url: str, headers: Optional[dict] = None, timeout: float = DEFAULT_TIMEOUT) -> str:
+    _, resp_headers, data = POOL.request("GET", url, headers=headers, timeout=timeout)
+    return data.decode(resp_headers.get_content_charset() or "utf-8", errors="replace")
+
+
+def get_cached(
+    url: str,
+    parse: Callable,
+    headers: Optional[dict] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    items: Optional[str] = None,
+    revive: Optional[Callable] = None,
+    fmt: str = "",
+):
+    """
+    Conditional GET. On 200, returns parse(json_body) and caches it together
+    with the response validators; on 304, returns the cached parsed result
+    without touching the body at all. The cache holds the JSON form of that
+    result, so when parse builds objects (providers.Job), `revive` turns the
+    cached JSON back into them. `fmt` names the shape parse produces (see
+    ResponseCache); change it whenever parse's output changes.
+
+    With `items` (an ijson path such as 'jobs.item'), parse receives an
+    iterator over the elements of that array instead of the whole document;
+    with ijson installed they are decoded while the body downloads.
+    """
+    entry = CACHE.get(url, fmt)
+    hdrs = dict(headers or {})
+    if entry:
+        if entry.get("etag"):
+            hdrs["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            hdrs["If-Modified-Since"] = entry["last_modified"]
+
+    streamed = False
+    if items and ijson is not None:
+        with POOL.stream("GET", url, headers=hdrs, timeout=timeout) as (status, resp_headers, body):
+            length = int(resp_headers.get("Content-Length") or -1)
+            gzipped = resp_headers.get("Content-Encoding", "").lower() == "gzip"
+            threshold = STREAM_MIN_GZIP_BYTES if gzipped else STREAM_MIN_BYTES
+            streamed = status != 304 and (length < 0 or length >= threshold)
+            if streamed:
+                # Download, decode and parse overlap, so this all counts as request time in metrics
+                result = parse(ijson.items(body, items, use_float=True))
+            else:
+                data = body.read()
+    else:
+        status, resp_headers, data = POOL.request("GET", url, headers=hdrs, timeout=timeout)
+
+    if status == 304 and entry:
+        logger.debug(f"[http-cache] 304 Not Modified: {url}")
+        body = CACHE.body(url)
+        if body is None:  # entry vanished since the header was read; ask again unconditionally
+            return get_cached(url, parse, headers, timeout, items, revive, fmt)
+        return revive(body) if revive else body
+    if not streamed:
+        result = _parse(data, (lambda tree: parse(_select(tree, items))) if items else parse)
+
+    CACHE.put(url, resp_headers.get("ETag"), resp_headers.get("Last-Modified"), result, fmt)
+    return result
+
+
+def post_json(url: str, payload, headers: Optional[dict] = None, timeout: float = DEFAULT_TIMEOUT):
+    hdrs = {"Content-Type": "application/json", "Accept": "application/json"}
+    hdrs.update(headers or {})
+    body = orjson.dumps(payload) if orjson is not None else json.dumps(payload).encode("utf-8")
+    _, _, data = POOL.request("POST", url, body=body, headers=hdrs, timeout=timeout)
+    return _parse(data)
+
+
+async def _run(fn, url: str, *args):
+    global_sem, host_sem = _limits(urllib.parse.urlsplit(url).hostname)
+    # Take the host slot first so a saturated host doesn't hold global slots idle
+    async with host_sem, global_sem:
+        loop = asyncio.get_running_loop()
+        # Run in a copy of the caller's context so metrics see the current company
+        call = functools.partial(contextvars.copy_context().run, fn, url, *args)
+        return await loop.run_in_executor(_EXECUTOR, call)
+
+
+async def aget_json(url: str, headers: Optional[dict] = None, timeout: float = DEFAULT_TIMEOUT):
+    return await _run(get_json, url, headers, timeout)
+
+
+async def aget_text(url: str, headers: Optional[dict] = None, timeout: float = DEFAULT_TIMEOUT) -> str:
+    return await _run(get_text, url, headers, timeout)
+
+
+async def aget_cached(
+    url: str,
+    parse: Callable,
+    headers: Optional[dict] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    items: Optional[str] = None,
+    revive: Optional[Callable] = None,
+    fmt: str = "",
+):
+    return await _run(get_cached, url, parse, headers, timeout, items, revive, fmt)
+
+
+async def apost_json(url: str, payload, headers: Optional[dict] = None, timeout: float = DEFAULT_TIMEOUT):
+    return await _run(post_json, url, payload, headers, timeout)
@@ -4,16 +4,30 @@ Uber Careers — uses Playwright to fetch jobs via Uber's internal API.
 Uber uses a custom careers page with session-based auth, so a real
 browser is required to collect the correct cookies and CSRF tokens.
 
-Normalized schema output matches the job_radar standard:
+The browser's storage state (cookies) is persisted to UBER_SESSION_FILE.
+When a saved session exists, listing pages are requested with plain HTTP
+through providers/transport.py and Chromium is only launched if Uber
+rejects the session (or a description has to be rendered).
+
+Listing pages are requested concurrently. By default a description comes
+from the job page's JobPosting JSON-LD, fetched over plain HTTP; otherwise
+the page is rendered by a small pool of reusable browser pages.
+
+Returns providers.Job records:
     job_id, company, title, location, posted_at, apply_url, provider, description
 """
 
+import asyncio
 import json
 import logging
+import os
 import re
 import time
+from typing import Optional
 
-from playwright.sync_api import sync_playwright
+import metrics
+from fileio import read_json, write_json
+from providers import Job, transport
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +36,37 @@ UBER_CAREERS_BASE = "https://www.uber.com/global/en/careers/list"
 LINE_OF_BUSINESS = "Corporate"
 SEARCH_QUERY = "Software Engineer"
 PAGE_LIMIT = 10
+PAGE_CONCURRENCY = 3
+SESSION_FILE = os.environ.get("UBER_SESSION_FILE", "state/uber_session.json")
+DESCRIPTION_CONCURRENCY = int(os.environ.get("UBER_DESCRIPTION_WORKERS", "4"))
+# "api" = JSON-LD from the raw job page, falling back to rendering; "page" = always render
+DESCRIPTION_SOURCE = os.environ.get("UBER_DESCRIPTION_SOURCE", "api")
+
+DESCRIPTION_SELECTORS = [
+    "[data-testid='job-description']",
+    "[class*='JobDescription']",
+    "[class*='job-description']",
+    "[class*='description']",
+]
+# A description element counts as rendered once it holds this much text
+MIN_DESCRIPTION_CHARS = 200
+# Resolves to the first description element with enough text, else null
+_DESCRIPTION_JS = """([selectors, minChars]) => {
+    for (const sel of selectors) {
+        for (const el of document.querySelectorAll(sel)) {
+            const text = (el.innerText || "").trim();
+            if (text.length > minChars) return text;
+        }
+    }
+    return null;
+}"""
+# Resource types the description pages never need
+BLOCKED_RESOURCES = {"image", "media", "font", "stylesheet"}
+
+_JSON_LD = re.compile(
+    r'<script[^>]+type=["\']application/ld\+json["\'][^>]*>(.*?)</script>',
+    re.IGNORECASE | re.DOTALL,
+)
 
 HEADERS = {
     "User-Agent": (
@@ -123,11 +168,49 @@ def _passes_yoe(description: str) -> bool:
 
 # ── Playwright fetch ──────────────────────────────────────────────────────────
 
-def _fetch_all_jobs(browser_context) -> list[dict]:
+def _page_body(pg: int) -> dict:
+    return {
+        "limit": PAGE_LIMIT,
+        "page": pg,
+        "params": {
+            "lineOfBusinessName": [LINE_OF_BUSINESS],
+            "query": SEARCH_QUERY,
+        }
+    }
+
+
+async def _load_page(page, pg: int) -> list[dict]:
+    """POSTs one listing page via browser fetch() so session cookies are included."""
+    post_body = json.dumps(_page_body(pg))
+    started = time.perf_counter()
+    result = await page.evaluate(f"""
+        async () => {{
+            const resp = await fetch({json.dumps(UBER_API_URL)}, {{
+                method: "POST",
+                credentials: "include",
+                headers: {{
+                    "content-type": "application/json",
+                    "x-csrf-token": "x",
+                    "x-uber-sites-page-edge-cache-enabled": "true"
+                }},
+                body: {json.dumps(post_body)}
+            }});
+            const ct = resp.headers.get("content-type") || "";
+            if (!ct.includes("json")) {{
+                const txt = await resp.text();
+                throw new Error("Non-JSON (" + resp.status + "): " + txt.substring(0, 120));
+            }}
+            return await resp.json();
+        }}
+    """)
+    metrics.record_request(0, time.perf_counter() - started, browser=True)
+    return result.get("data", {}).get("results", [])
+
+
+async def _fetch_all_jobs(browser_context) -> list[dict]:
     """
-    Loads Uber's careers page in a real browser, intercepts the page-0 API
-    response, then POSTs subsequent pages via browser fetch() (so session
-    cookies are automatically included).
+    Loads Uber's careers page in a real browser, waits for the page-0 API
+    response, then POSTs the remaining pages concurrently via browser fetch().
     """
     careers_url = (
         f"https://www.uber.com/us/en/careers/list/"
@@ -135,94 +218,56 @@ def _fetch_all_jobs(browser_context) -> list[dict]:
         f"&lineOfBusinessName={LINE_OF_BUSINESS}"
     )
 
+    page = await browser_context.new_page()
     all_results = []
     total_available = 0
 
-    page = browser_context.new_page()
-
-    def on_response(response):
-        nonlocal total_available
-        if "loadSearchJobsResults" not in response.url or response.status != 200:
-            return
-        try:
-            body = response.json()
-            data = body.get("data", {})
-            results = data.get("results", [])
-            raw_total = data.get("totalResults", 0)
-            if raw_total:
-                total_available = _parse_total(raw_total)
-            all_results.extend(results)
-            logger.info(f"[uber] page-0 intercept: +{len(results)} jobs, total={total_available}")
-        except Exception as e:
-            logger.warning(f"[uber] could not parse page-0 response: {e}")
-
-    page.on("response", on_response)
-
     logger.info(f"[uber] loading careers page...")
     try:
-        page.goto(careers_url, wait_until="networkidle", timeout=60_000)
+        async with page.expect_response(
+            lambda r: "loadSearchJobsResults" in r.url and r.status == 200,
+            timeout=60_000,
+        ) as response_info:
+            await page.goto(careers_url, wait_until="domcontentloaded", timeout=60_000)
+        body = await (await response_info.value).json()
+        data = body.get("data", {})
+        all_results.extend(data.get("results", []))
+        total_available = _parse_total(data.get("totalResults", 0))
+        logger.info(f"[uber] page-0 intercept: +{len(all_results)} jobs, total={total_available}")
     except Exception as e:
         logger.warning(f"[uber] page load warning: {e}")
-    time.sleep(3)
 
     if not total_available:
         logger.error("[uber] no API response intercepted — careers page may have changed")
-        page.close()
+        await page.close()
         return []
 
     total_pages = (total_available + PAGE_LIMIT - 1) // PAGE_LIMIT
     logger.info(f"[uber] {total_available} total jobs across {total_pages} page(s)")
 
-    for pg in range(1, total_pages):
-        if len(all_results) >= total_available:
-            break
+    sem = asyncio.Semaphore(PAGE_CONCURRENCY)
 
-        post_body = json.dumps({
-            "limit": PAGE_LIMIT,
-            "page": pg,
-            "params": {
-                "lineOfBusinessName": [LINE_OF_BUSINESS],
-                "query": SEARCH_QUERY,
-            }
-        })
+    async def bounded(pg: int) -> list[dict]:
+        async with sem:
+            try:
+                results = await _load_page(page, pg)
+                logger.info(f"[uber] page {pg}: +{len(results)}")
+                return results
+            except Exception as e:
+                logger.error(f"[uber] failed on page {pg}: {e}")
+                return []
 
-        try:
-            result = page.evaluate(f"""
-                async () => {{
-                    const resp = await fetch({json.dumps(UBER_API_URL)}, {{
-                        method: "POST",
-                        credentials: "include",
-                        headers: {{
-                            "content-type": "application/json",
-                            "x-csrf-token": "x",
-                            "x-uber-sites-page-edge-cache-enabled": "true"
-                        }},
-                        body: {json.dumps(post_body)}
-                    }});
-                    const ct = resp.headers.get("content-type") || "";
-                    if (!ct.includes("json")) {{
-                        const txt = await resp.text();
-                        throw new Error("Non-JSON (" + resp.status + "): " + txt.substring(0, 120));
-                    }}
-                    return await resp.json();
-                }}
-            """)
-            data = result.get("data", {})
-            results = data.get("results", [])
-            if not results:
-                logger.info(f"[uber] no results on page {pg} — stopping early")
-                break
-            all_results.extend(results)
-            logger.info(f"[uber] page {pg}: +{len(results)} (running: {len(all_results)}/{total_available})")
-        except Exception as e:
-            logger.error(f"[uber] failed on page {pg}: {e}")
-            break
-
-        time.sleep(0.3)
-
-    page.close()
-
-    # Deduplicate by id
+    for results in await asyncio.gather(*(bounded(pg) for pg in range(1, total_pages))):
+        all_results.extend(results)
+
+    await page.close()
+
+    unique = _dedupe(all_results)
+    logger.info(f"[uber] {len(unique)} unique jobs fetched")
+    return unique
+
+
+def _dedupe(all_results: list[dict]) -> list[dict]:
     seen_ids: set[str] = set()
     unique = []
     for item in all_results:
@@ -230,12 +275,81 @@ def _fetch_all_jobs(browser_context) -> list[dict]:
         if jid and jid not in seen_ids:
             seen_ids.add(jid)
             unique.append(item)
+    return unique
+
+
+# ── Saved session (plain HTTP) ───────────────────────────────────────────────
+
+def _load_session(path: str = SESSION_FILE) -> Optional[dict]:
+    try:
+        return read_json(path)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_session(state: dict, path: str = SESSION_FILE) -> None:
+    # Session cookies are credentials — keep the file private to the user
+    write_json(path, state, mode=0o600)
+    logger.info(f"[uber] session saved to {path}")
+
 
+def _session_headers(session: Optional[dict]) -> dict:
+    now = time.time()
+    cookies = [
+        f"{c['name']}={c['value']}"
+        for c in (session or {}).get("cookies", [])
+        if "uber.com" in c.get("domain", "") and (c.get("expires", -1) < 0 or c["expires"] > now)
+    ]
+    headers = {"User-Agent": HEADERS["User-Agent"]}
+    if cookies:
+        headers["Cookie"] = "; ".join(cookies)
+    return headers
+
+
+async def _fetch_all_jobs_http(session: dict) -> Optional[list[dict]]:
+    """
+    Pages through loadSearchJobsResults with the saved session's cookies.
+    Returns None when the session is rejected, so the caller falls back to
+    the browser.
+    """
+    headers = _session_headers(session)
+    headers.update({
+        "x-csrf-token": "x",
+        "x-uber-sites-page-edge-cache-enabled": "true",
+    })
+    try:
+        first = (await transport.apost_json(UBER_API_URL, _page_body(0), headers)).get("data", {})
+    except Exception as e:
+        logger.info(f"[uber] saved session rejected ({e}) — falling back to browser")
+        return None
+    total_available = _parse_total(first.get("totalResults", 0))
+    if not total_available:
+        logger.info("[uber] saved session returned no results — falling back to browser")
+        return None
+
+    total_pages = (total_available + PAGE_LIMIT - 1) // PAGE_LIMIT
+    logger.info(f"[uber] {total_available} total jobs across {total_pages} page(s) (saved session)")
+    sem = asyncio.Semaphore(PAGE_CONCURRENCY)
+
+    async def bounded(pg: int) -> list[dict]:
+        async with sem:
+            try:
+                data = await transport.apost_json(UBER_API_URL, _page_body(pg), headers)
+                return data.get("data", {}).get("results", [])
+            except Exception as e:
+                logger.error(f"[uber] failed on page {pg}: {e}")
+                return []
+
+    all_results = list(first.get("results", []))
+    for results in await asyncio.gather(*(bounded(pg) for pg in range(1, total_pages))):
+        all_results.extend(results)
+
+    unique = _dedupe(all_results)
     logger.info(f"[uber] {len(unique)} unique jobs fetched")
     return unique
 
 
-def _parse_job(item: dict) -> dict:
+def _parse_job(item: dict) -> Job:
     job_id = str(item.get("id", ""))
     title = item.get("title", "").strip()
 
@@ -247,96 +361,208 @@ def _parse_job(item: dict) -> dict:
     else:
         location = str(location_raw)
 
-    return {
-        "job_id": f"uber-{job_id}",
-        "company": "Uber",
-        "title": title,
-        "location": location,
-        "posted_at": None,
-        "apply_url": f"{UBER_CAREERS_BASE}/{job_id}/",
-        "provider": "uber",
-        "description": item.get("description", ""),
-        "_uber_id": job_id,
-    }
+    return Job(
+        job_id=f"uber-{job_id}",
+        company="Uber",
+        title=title,
+        location=location,
+        posted_at=None,
+        apply_url=f"{UBER_CAREERS_BASE}/{job_id}/",
+        provider="uber",
+        description=item.get("description", ""),
+    )
+
+
+def _description_from_html(page_html: str) -> str:
+    """Extracts the JobPosting description embedded as JSON-LD in a job page."""
+    for block in _JSON_LD.findall(page_html):
+        try:
+            data = json.loads(block)
+        except ValueError:
+            continue
+        for item in data if isinstance(data, list) else [data]:
+            if isinstance(item, dict) and item.get("@type") == "JobPosting" and item.get("description"):
+                return item["description"]
+    return ""
 
 
-def _scrape_description(job_id: str, browser_context) -> str:
+async def _fetch_description(job_id: str, session: Optional[dict]) -> str:
+    """Fetches the raw job page over plain HTTP — no browser, no rendering."""
+    url = f"{UBER_CAREERS_BASE}/{job_id}/"
+    try:
+        return _description_from_html(await transport.aget_text(url, _session_headers(session), 30))
+    except Exception as e:
+        logger.warning(f"[uber] could not fetch job {job_id}: {e}")
+    return ""
+
+
+async def _scrape_description(job_id: str, page) -> str:
+    """Renders the job page on a pooled page and reads the description element."""
     url = f"{UBER_CAREERS_BASE}/{job_id}/"
-    page = browser_context.new_page()
     description = ""
     try:
-        page.goto(url, wait_until="domcontentloaded", timeout=30_000)
-        time.sleep(2)
-        for sel in [
-            "[data-testid='job-description']",
-            "[class*='JobDescription']",
-            "[class*='job-description']",
-            "[class*='description']",
-            "div[class*='content']",
-            "main",
-        ]:
-            el = page.query_selector(sel)
-            if el:
-                text = el.inner_text().strip()
-                if len(text) > 200:
-                    description = text
-                    break
-        if not description:
-            description = page.evaluate("() => document.body.innerText") or ""
+        await page.goto(url, wait_until="domcontentloaded", timeout=30_000)
+        # Wait for the description itself, not just the page shell; page-wide
+        # text would hide the YOE requirement and hash differently every run
+        handle = await page.wait_for_function(
+            _DESCRIPTION_JS, arg=[DESCRIPTION_SELECTORS, MIN_DESCRIPTION_CHARS], timeout=10_000,
+        )
+        description = await handle.json_value() or ""
     except Exception as e:
         logger.warning(f"[uber] could not scrape job {job_id}: {e}")
-    finally:
-        page.close()
     return description
 
 
+class PagePool:
+    """A fixed set of reusable pages handed out to concurrent description scrapes."""
+
+    def __init__(self, browser_context, size: int):
+        self.context = browser_context
+        self.size = size
+        self._pages: asyncio.Queue = asyncio.Queue()
+        self._created = 0
+
+    async def acquire(self):
+        if self._pages.empty() and self._created < self.size:
+            self._created += 1
+            return await self.context.new_page()
+        return await self._pages.get()
+
+    def release(self, page) -> None:
+        self._pages.put_nowait(page)
+
+    async def close(self) -> None:
+        while not self._pages.empty():
+            await self._pages.get_nowait().close()
+
+
+async def _block_heavy_resources(route) -> None:
+    if route.request.resource_type in BLOCKED_RESOURCES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+class LazyBrowser:
+    """Starts Playwright and Chromium on first use, seeded with the saved session."""
+
+    def __init__(self, session: Optional[dict]):
+        self.session = session
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._pool: Optional[PagePool] = None
+        self._lock = asyncio.Lock()
+
+    async def context(self):
+        async with self._lock:
+            if self._context is None:
+                logger.info("[uber] launching browser...")
+                # Imported here so runs served by the saved HTTP session never load Playwright
+                from playwright.async_api import async_playwright
+
+                self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=True)
+                self._context = await self._browser.new_context(
+                    user_agent=HEADERS["User-Agent"],
+                    viewport={"width": 1280, "height": 900},
+                    locale="en-US",
+                    storage_state=self.session,
+                )
+            return self._context
+
+    async def pool(self) -> PagePool:
+        context = await self.context()
+        # Checked again under the lock: route() awaits, and concurrent
+        # _describe calls would otherwise each register a route and a pool
+        async with self._lock:
+            if self._pool is None:
+                await context.route("**/*", _block_heavy_resources)
+                self._pool = PagePool(context, DESCRIPTION_CONCURRENCY)
+            return self._pool
+
+    async def save_session(self) -> dict:
+        self.session = await self._context.storage_state()
+        _save_session(self.session)
+        return self.session
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+        if self._browser is not None:
+            await self._browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+
+
+async def _describe(job: Job, browser: LazyBrowser) -> str:
+    job_id = job.job_id.removeprefix("uber-")
+    if DESCRIPTION_SOURCE == "api":
+        desc = await _fetch_description(job_id, browser.session)
+        if desc:
+            return desc
+        # Rendered text never hashes like the JSON-LD HTML; don't let the
+        # fallback read as an edit (now, and again once the API is back)
+        job.incomplete = True
+    pool = await browser.pool()
+    page = await pool.acquire()
+    try:
+        return await _scrape_description(job_id, page)
+    finally:
+        pool.release(page)
+
+
 # ── Provider entry point ──────────────────────────────────────────────────────
 
-def fetch(company_cfg: dict) -> list[dict]:
+def fetch(company_cfg: dict) -> list[Job]:
+    return asyncio.run(fetch_async(company_cfg))
+
+
+async def fetch_async(company_cfg: dict) -> list[Job]:
     """
-    job_radar provider interface. Launches a Playwright browser, fetches
-    all Uber Software Engineer jobs, applies title + location + YOE filters,
-    and returns normalized job dicts.
+    job_radar provider interface. Fetches all Uber Software Engineer jobs
+    (over the saved session if it is still accepted, otherwise through a
+    browser), applies title + location + YOE filters, and returns normalized
+    Jobs.
     """
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(
-            user_agent=HEADERS["User-Agent"],
-            viewport={"width": 1280, "height": 900},
-            locale="en-US",
-        )
-
-        raw_items = _fetch_all_jobs(context)
+    session = _load_session()
+    browser = LazyBrowser(session)
+    try:
+        raw_items = await _fetch_all_jobs_http(session) if session else None
+        if raw_items is None:
+            raw_items = await _fetch_all_jobs(await browser.context())
+            if raw_items:
+                await browser.save_session()
         if not raw_items:
-            browser.close()
             return []
 
         jobs = [_parse_job(item) for item in raw_items if item.get("id") and item.get("title")]
 
         # Title + location pre-filter (before scraping to minimize page loads)
-        candidates = [j for j in jobs if _passes_title(j["title"]) and _passes_location(j["location"])]
+        candidates = [j for j in jobs if _passes_title(j.title) and _passes_location(j.location)]
         logger.info(f"[uber] {len(candidates)} jobs pass title+location filter (from {len(jobs)} total)")
 
-        # Scrape description for jobs where the API description is too short
-        final = []
-        for i, job in enumerate(candidates, 1):
-            desc = job.get("description", "")
-            if not desc or len(desc) < 100:
-                logger.info(f"[uber] [{i}/{len(candidates)}] scraping: {job['title']}")
-                desc = _scrape_description(job["_uber_id"], context)
-                job["description"] = desc
-
-            if _passes_yoe(desc):
-                final.append(job)
-            else:
-                min_yoe = _extract_min_yoe(desc)
-                logger.info(f"[uber] skip (requires {min_yoe}yr): {job['title']}")
-
-        browser.close()
-
-    # Clean up internal field before returning
-    for job in final:
-        job.pop("_uber_id", None)
+        # Fetch descriptions concurrently for jobs where the API description is too short
+        to_describe = [j for j in candidates if len(j.description) < 100]
+        logger.info(f"[uber] fetching {len(to_describe)} description(s), {DESCRIPTION_CONCURRENCY} at a time")
+        sem = asyncio.Semaphore(DESCRIPTION_CONCURRENCY)
+
+        async def describe(job: Job) -> None:
+            async with sem:
+                job.description = await _describe(job, browser)
+
+        await asyncio.gather(*(describe(j) for j in to_describe))
+    finally:
+        await browser.close()
+
+    final = []
+    for job in candidates:
+        desc = job.description
+        if _passes_yoe(desc):
+            final.append(job)
+        else:
+            min_yoe = _extract_min_yoe(desc)
+            logger.info(f"[uber] skip (requires {min_yoe}yr): {job.title}")
 
     logger.info(f"[uber] {len(final)} jobs after all filters")
     return final
@@ -7,19 +7,36 @@ companies.yaml format:
   - name: Nvidia
     provider: workday_url
     url: https://nvidia.wd5.myworkdayjobs.com/wday/cxs/nvidia/NVIDIAExternalCareerSite/jobs
+    page_size: 20          # optional, CXS rejects limits above 20
+    page_concurrency: 4    # optional, concurrent page requests per tenant
+    search_text: software engineer                 # optional, server-side search
+    facets:                                        # optional, server-side facets
+      jobFamilyGroup: [0c40f6bd1d8f10ae43ffaefd46dc7e78]
+      locationHierarchy1: [2fcb99c455831013ea52fb338f2932d8]
+
+Facet parameters and value IDs differ per tenant; list them with
+`python main.py --company Nvidia --list-facets`.
+
+The first page reports `total`; the remaining offsets are then fetched
+concurrently and reassembled in offset order. Without search_text, CXS lists
+postings newest first, so when main.py passes a `since` watermark the pages
+are fetched in waves of page_concurrency and paging stops after the first
+wave that reaches a page posted entirely before it.
 """
 
-import json
+import asyncio
 import logging
 import re
 import urllib.error
-import urllib.request
 from datetime import date, timedelta
 from typing import Optional
 
+from providers import Job, PartialFetch, transport
+
 logger = logging.getLogger(__name__)
 
 PAGE_SIZE = 20
+PAGE_CONCURRENCY = 4
 
 
 def _parse_posted_on(posted_on: str) -> str:
@@ -47,26 +64,32 @@ def _normalize_workday_location(loc: str) -> str:
     return loc
 
 
-def _post_page(api_url: str, offset: int = 0) -> Optional[dict]:
-    payload = json.dumps({
-        "appliedFacets": {},
-        "limit": PAGE_SIZE,
+def _older_than(page: Optional[dict], since: str) -> bool:
+    """True if every posting on the page has a known posted date before `since`."""
+    dates = [_parse_posted_on(item.get("postedOn")) for item in (page or {}).get("jobPostings", [])]
+    return bool(dates) and all(d is not None and d < since for d in dates)
+
+
+def _applied_facets(company_cfg: dict) -> dict[str, list[str]]:
+    facets = company_cfg.get("facets") or {}
+    return {k: v if isinstance(v, list) else [v] for k, v in facets.items()}
+
+
+async def _post_page(
+    api_url: str,
+    offset: int = 0,
+    page_size: int = PAGE_SIZE,
+    search_text: str = "",
+    facets: Optional[dict] = None,
+) -> Optional[dict]:
+    payload = {
+        "appliedFacets": facets or {},
+        "limit": page_size,
         "offset": offset,
-        "searchText": "",
-    }).encode("utf-8")
+        "searchText": search_text,
+    }
     try:
-        req = urllib.request.Request(
-            api_url,
-            data=payload,
-            headers={
-                "User-Agent": "JobRadar/1.0",
-                "Content-Type": "application/json",
-                "Accept": "application/json",
-            },
-            method="POST",
-        )
-        with urllib.request.urlopen(req, timeout=15) as resp:
-            return json.loads(resp.read().decode("utf-8"))
+        return await transport.apost_json(api_url, payload)
     except urllib.error.HTTPError as e:
         logger.warning(f"[workday] {api_url} → HTTP {e.code}")
     except Exception as e:
@@ -74,45 +97,120 @@ def _post_page(api_url: str, offset: int = 0) -> Optional[dict]:
     return None
 
 
-def fetch(company_cfg: dict) -> list[dict]:
+def fetch(company_cfg: dict) -> list[Job]:
+    return asyncio.run(fetch_async(company_cfg))
+
+
+async def fetch_async(company_cfg: dict) -> list[Job]:
     api_url = company_cfg.get("url", "")
     name = company_cfg.get("name", "Unknown")
     if not api_url:
         logger.warning(f"[workday] {name} missing url in companies.yaml")
         return []
 
+    page_size = int(company_cfg.get("page_size", PAGE_SIZE))
+    concurrency = int(company_cfg.get("page_concurrency", PAGE_CONCURRENCY))
+    search_text = company_cfg.get("search_text", "")
+    facets = _applied_facets(company_cfg)
+
+    first = await _post_page(api_url, 0, page_size, search_text, facets)
+    if not first or not first.get("jobPostings"):
+        logger.info(f"[workday] {name}: 0 jobs")
+        return []
+
+    # Only the first page carries a reliable `total`
+    offsets = list(range(page_size, first.get("total", 0), page_size))
+    sem = asyncio.Semaphore(concurrency)
+
+    async def bounded(offset: int) -> Optional[dict]:
+        async with sem:
+            return await _post_page(api_url, offset, page_size, search_text, facets)
+
+    since = company_cfg.get("since")
+    if since and not search_text:
+        pages = [first]
+        fetched = 0
+        if not _older_than(first, since):
+            for i in range(0, len(offsets), concurrency):
+                wave = await asyncio.gather(*(bounded(o) for o in offsets[i:i + concurrency]))
+                pages.extend(wave)
+                fetched = i + len(wave)
+                if any(_older_than(p, since) for p in wave):
+                    break
+        if fetched < len(offsets):
+            logger.info(f"[workday] {name}: reached watermark {since} after {len(pages)} pages")
+        offsets = offsets[:fetched]
+    else:
+        pages = [first] + list(await asyncio.gather(*(bounded(o) for o in offsets)))
+
+    base = api_url.split("/wday/")[0]
+    seen: set[str] = set()
     all_jobs = []
-    offset = 0
-    while True:
-        page = _post_page(api_url, offset)
+    failed = 0
+    for offset, page in zip([0] + offsets, pages):
         if not page:
-            break
-        postings = page.get("jobPostings", [])
-        if not postings:
-            break
-
-        base = api_url.split("/wday/")[0]
-        for item in postings:
+            failed += 1
+            continue  # already logged by _post_page; keep the other pages
+        for item in page.get("jobPostings", []):
             ext_path = item.get("externalPath", "")
             slug = ext_path.split("/")[-1] if ext_path else str(offset)
+            job_id = f"workday-{name.lower().replace(' ', '-')}-{slug}"
+            # Postings can shift between pages while they are fetched concurrently
+            if job_id in seen:
+                continue
+            seen.add(job_id)
             loc = item.get("locationsText") or item.get("locations") or ""
             if isinstance(loc, list):
                 loc = ", ".join(loc)
             loc = _normalize_workday_location(loc)
-            all_jobs.append({
-                "job_id": f"workday-{name.lower().replace(' ', '-')}-{slug}",
-                "company": name,
-                "title": item.get("title", ""),
-                "location": loc,
-                "posted_at": _parse_posted_on(item.get("postedOn")),
-                "apply_url": base + ext_path if ext_path else "",
-                "provider": "workday",
-            })
-
-        total = page.get("total", 0)
-        offset += PAGE_SIZE
-        if offset >= total:
-            break
-
-    logger.info(f"[workday] {name}: {len(all_jobs)} jobs")
+            all_jobs.append(Job(
+                job_id=job_id,
+                company=name,
+                title=item.get("title", ""),
+                location=loc,
+                posted_at=_parse_posted_on(item.get("postedOn")),
+                apply_url=base + ext_path if ext_path else "",
+                provider="workday",
+            ))
+
+    logger.info(f"[workday] {name}: {len(all_jobs)} jobs ({len(pages)} pages)")
+    if failed:
+        raise PartialFetch(all_jobs, f"{failed} of {len(pages)} Workday pages failed")
     return all_jobs
+
+
+def _flatten_facets(facets: list, parent: str = "") -> list[dict]:
+    """Facet groups can nest (e.g. locationMainGroup → locationHierarchy1)."""
+    rows = []
+    for facet in facets or []:
+        param = facet.get("facetParameter") or parent
+        for value in facet.get("values", []):
+            if "values" in value:
+                rows.extend(_flatten_facets([value], param))
+            else:
+                rows.append({
+                    "facet": param,
+                    "group": facet.get("descriptor", ""),
+                    "id": value.get("id", ""),
+                    "label": value.get("descriptor", ""),
+                    "count": value.get("count", 0),
+                })
+    return rows
+
+
+async def list_facets_async(company_cfg: dict) -> list[dict]:
+    """
+    Returns the facet values the tenant offers for the configured search,
+    as rows of {facet, group, id, label, count}, for filling in `facets:`.
+    """
+    api_url = company_cfg.get("url", "")
+    if not api_url:
+        return []
+    page = await _post_page(
+        api_url, 0, 1, company_cfg.get("search_text", ""), _applied_facets(company_cfg),
+    )
+    return _flatten_facets((page or {}).get("facets", []))
+
+
+def list_facets(company_cfg: dict) -> list[dict]:
+    return asyncio.run(list_facets_async(company_cfg))
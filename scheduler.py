@@ -0,0 +1,75 @@
+"""
+scheduler.py
+Adaptive per-company scan scheduling.
+
+Each company keeps an exponentially weighted change rate: the share of its
+recent scans that turned up new or changed (post-filter) jobs. The rate
+sets a polling interval in runs — boards that keep posting are scanned
+every run, quiet ones back off to every JOB_RADAR_MAX_INTERVAL runs (default
+8, 1 = scan everything every run). Companies never scanned before start hot.
+State lives in the `schedule` table of the seen-jobs database.
+"""
+
+import logging
+import os
+
+from diff import DEFAULT_STATE_FILE, StateStore, company_key
+
+logger = logging.getLogger(__name__)
+
+MAX_INTERVAL = int(os.environ.get("JOB_RADAR_MAX_INTERVAL", "8"))
+# Weight of the latest scan in the change rate; 0.3 takes ~4 quiet scans to halve it
+RATE_WEIGHT = 0.3
+INITIAL_RATE = 1.0
+
+
+def interval(change_rate: float, max_interval: int = MAX_INTERVAL) -> int:
+    """Runs between scans: 1 for a rate of 1, 1/rate in between, capped at max_interval."""
+    if max_interval <= 1:
+        return 1
+    return max(1, min(max_interval, int(1 / max(change_rate, 1 / max_interval))))
+
+
+def due_companies(
+    companies: list[dict],
+    state_path: str = DEFAULT_STATE_FILE,
+) -> tuple[list[dict], list[dict]]:
+    """
+    Returns:
+        due      — companies to scan this run
+        skipped  — companies whose interval has not elapsed yet
+    """
+    if MAX_INTERVAL <= 1:
+        return companies, []
+    with StateStore(state_path) as store:
+        schedule = store.schedule(company_key(c) for c in companies)
+
+    due, skipped = [], []
+    for cfg in companies:
+        rate, runs_skipped = schedule.get(company_key(cfg), (INITIAL_RATE, 0))
+        (due if runs_skipped + 1 >= interval(rate) else skipped).append(cfg)
+    if skipped:
+        logger.info(f"Scheduling: {len(due)} companies due, {len(skipped)} dormant ones skipped this run")
+    return due, skipped
+
+
+def record_scans(
+    scanned: list[str],
+    active: set[str],
+    skipped: list[dict] = (),
+    state_path: str = DEFAULT_STATE_FILE,
+) -> None:
+    """
+    Updates change rates from this run's diff. `scanned` are the
+    company_key()s whose fetch returned jobs — a company whose fetch came
+    back empty keeps its previous schedule, so a failing board stays due —
+    and `active` those with new or changed jobs.
+    """
+    with StateStore(state_path) as store:
+        previous = store.schedule(scanned)
+        rows = []
+        for key in scanned:
+            rate = previous.get(key, (INITIAL_RATE, 0))[0]
+            hit = 1.0 if key in active else 0.0
+            rows.append((key, (1 - RATE_WEIGHT) * rate + RATE_WEIGHT * hit))
+        store.save_schedule(rows, (company_key(c) for c in skipped))
@@ -0,0 +1,103 @@
+"""
+tests/test_transport.py
+Redirect and proxy handling of the pooled HTTP transport, against a local server.
+
+Run from the repository root:
+    python -m unittest discover tests
+"""
+
+import http.server
+import json
+import os
+import threading
+import unittest
+import urllib.error
+from unittest import mock
+
+from providers import transport
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _reply(self, status: int, body: bytes = b"", headers: dict = None) -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        self.server.seen.append((self.command, self.path))
+        if self.path == "/moved":
+            return self._reply(301, headers={"Location": "/board"})
+        if self.path == "/submitted":
+            return self._reply(303, headers={"Location": "/board"})
+        if self.path == "/loop":
+            return self._reply(302, headers={"Location": "/loop"})
+        self._reply(200, json.dumps({"method": self.command, "path": self.path, "body": body.decode()}).encode())
+
+    do_GET = do_POST = _route
+
+
+class TransportTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        cls.server.seen = []
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self) -> None:
+        self.server.seen.clear()
+        env = {k: v for k, v in os.environ.items() if "proxy" not in k.lower()}
+        patcher = mock.patch.dict(os.environ, env, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(transport.POOL.close)
+
+    def test_follows_301(self) -> None:
+        data = transport.get_json(f"{self.base}/moved")
+        self.assertEqual(data["path"], "/board")
+        self.assertEqual(self.server.seen, [("GET", "/moved"), ("GET", "/board")])
+
+    def test_303_after_post_becomes_get(self) -> None:
+        _, _, body = transport.POOL.request("POST", f"{self.base}/submitted", body=b"{}",
+                                            headers={"Content-Type": "application/json"})
+        self.assertEqual(json.loads(body), {"method": "GET", "path": "/board", "body": ""})
+
+    def test_stream_follows_redirect(self) -> None:
+        with transport.POOL.stream("GET", f"{self.base}/moved") as (status, _, reader):
+            self.assertEqual(status, 200)
+            self.assertEqual(json.loads(reader.read())["path"], "/board")
+
+    def test_redirect_loop_raises(self) -> None:
+        with self.assertRaises(urllib.error.HTTPError) as err:
+            transport.POOL.request("GET", f"{self.base}/loop")
+        self.assertEqual(err.exception.code, 302)
+        self.assertEqual(len(self.server.seen), transport.MAX_REDIRECTS + 1)
+
+    def test_http_proxy(self) -> None:
+        os.environ["HTTP_PROXY"] = self.base
+        data = transport.get_json("http://boards.example.invalid/board")
+        self.assertEqual(data["path"], "http://boards.example.invalid/board")
+
+    def test_no_proxy(self) -> None:
+        os.environ["HTTP_PROXY"] = "http://127.0.0.1:9"
+        os.environ["NO_PROXY"] = "127.0.0.1"
+        self.assertEqual(transport.get_json(f"{self.base}/board")["path"], "/board")
+
+
+if __name__ == "__main__":
+    unittest.main()